@@ -0,0 +1,235 @@
+# backtest/replay.py
+"""
+Accelerated historical replay / paper trading through the live code path.
+
+Stored candles (a market table in ``crypto_data.db`` or a CSV such as
+``btc_sample.csv``) are turned back into indexer-style candle dicts and fed,
+one candle at a time, through the same steps the live loop runs:
+``data_pipeline.candles_to_frame`` on the latest ``window`` candles, a signal
+function on that frame, and ``execution.execute_signal`` against a
+``SimulatedExchange`` with latency and slippage models. Candle time is
+compressed by ``speedup`` (None replays as fast as possible), and every stage
+is timed so the run doubles as a reproducible load test. The exchange does not
+sleep: each fill's modelled latency is added to the measured ``order`` stage
+(and so to the tick), as if the order round trip had taken that long. Markets
+can be replayed in parallel worker processes.
+
+Usage: python -m backtest.replay --markets BTC-USD ETH-USD --budget signal=20
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from config import TRADING_MARKETS
+from data_pipeline import candles_to_frame
+from execution import execute_signal
+from models.formula_7 import calculate_formula_7
+from utils.logger import setup_logger
+from utils.schema import apply_schema, read_market, to_datetime
+
+logger = setup_logger('replay', 'replay.log')
+
+STAGES = ['ingest', 'signal', 'order']
+
+
+def load_history(market='BTC-USD', source='crypto_data.db'):
+    """Load stored candles for ``market`` from a SQLite DB or a CSV history file."""
+    df = apply_schema(pd.read_csv(source, index_col=0)) if str(source).endswith('.csv') else read_market(market, source)
+    if df.empty or 'started_at' not in df.columns:
+        logger.error(f"No data or missing 'started_at' for {market} in {source}")
+        return pd.DataFrame()
+    return df.sort_values('started_at').reset_index(drop=True)
+
+
+def to_candles(df):
+    """Rebuild indexer API candle dicts (string fields, ISO ``startedAt``) from stored rows."""
+    started = to_datetime(df['started_at']).dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    cols = ['open', 'high', 'low', 'close', 'base_token_volume']
+    return [{'startedAt': ts, 'open': str(o), 'high': str(h), 'low': str(lo), 'close': str(c),
+             'baseTokenVolume': str(v)}
+            for ts, (o, h, lo, c, v) in zip(started, df[cols].itertuples(index=False, name=None))]
+
+
+def f7_strategy(df):
+    """Default signal: Formula 7 on the latest candle of the window."""
+    return int(calculate_formula_7(df)['f7_signal'].iloc[-1])
+
+
+class SimulatedExchange:
+    """
+    ccxt-like exchange that fills every order with modelled latency and slippage.
+
+    Fills return immediately; ``latency_ms`` is the simulated round trip,
+    which the replay harness counts in the order stage, and ``filled_at`` is
+    the candle time plus that latency.
+    """
+
+    def __init__(self, latency_ms=50.0, latency_jitter_ms=20.0, slippage_bps=2.0, seed=42):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.slippage_bps = slippage_bps
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        """Clear fills and positions and restart the latency/slippage draws."""
+        self.rng = np.random.default_rng(self.seed)
+        self.fills = []
+        self.positions = {}
+        self.clock = None
+
+    def create_order(self, market, order_type, side, size, price):
+        latency = max(0.0, self.latency_ms + self.rng.normal(0, self.latency_jitter_ms))
+        # Slippage always works against the order
+        slippage = abs(self.rng.normal(0, self.slippage_bps)) / 1e4
+        fill_price = price * (1 + slippage) if side == 'buy' else price * (1 - slippage)
+        self.positions[market] = self.positions.get(market, 0.0) + (size if side == 'buy' else -size)
+        fill = {'id': f"{market}-{len(self.fills)}", 'market': market, 'type': order_type, 'side': side, 'size': size,
+                'price': price, 'fill_price': fill_price, 'latency_ms': latency,
+                'candle_time': self.clock, 'filled_at': None if self.clock is None else self.clock + latency,
+                'status': 'closed'}
+        self.fills.append(fill)
+        return fill
+
+
+class ReplayHarness:
+    """Drive stored candles for several markets through ingest -> signal -> order."""
+
+    def __init__(self, markets=TRADING_MARKETS, source='crypto_data.db', strategy=f7_strategy, window=200,
+                 speedup=None, exchange=None, order_size=0.01):
+        self.markets = list(markets)
+        self.source = source
+        self.strategy = strategy
+        self.window = window
+        self.speedup = speedup
+        self.exchange = exchange or SimulatedExchange()
+        self.order_size = order_size
+
+    def _replay(self, markets, max_candles=None):
+        """Replay ``markets`` interleaved in candle-time order; return raw timings, decisions and fills."""
+        candles, times = {}, []
+        for market in markets:
+            df = load_history(market, self.source)
+            if df.empty:
+                continue
+            if max_candles is not None:
+                df = df.iloc[:max_candles]
+            candles[market] = to_candles(df)
+            times.append(pd.DataFrame({'started_at': df['started_at'], 'market': market, 'pos': np.arange(len(df))}))
+        timings = {stage: [] for stage in STAGES}
+        decisions = []
+        if not times:
+            return timings, decisions, self.exchange.fills, 0.0
+        ticks = pd.concat(times).sort_values(['started_at', 'market'], kind='stable')
+
+        first_ts = ticks['started_at'].iloc[0]
+        start = time.perf_counter()
+        for ts, market, pos in ticks.itertuples(index=False, name=None):
+            if self.speedup:
+                wait = (ts - first_ts) / 1000 / self.speedup - (time.perf_counter() - start)
+                if wait > 0:
+                    time.sleep(wait)
+            self.exchange.clock = ts
+
+            t0 = time.perf_counter()
+            df = candles_to_frame(candles[market][max(0, pos + 1 - self.window):pos + 1])
+            t1 = time.perf_counter()
+            signal = self.strategy(df)
+            t2 = time.perf_counter()
+            price = df['close'].iloc[-1]
+            order = execute_signal(market, signal, price, size=self.order_size, exchange=self.exchange)
+            t3 = time.perf_counter()
+
+            timings['ingest'].append(t1 - t0)
+            timings['signal'].append(t2 - t1)
+            # Simulated fills return at once; charge their modelled round trip to the order stage
+            timings['order'].append(t3 - t2 + (order.get('latency_ms', 0.0) / 1e3 if order else 0.0))
+            decisions.append({'started_at': ts, 'market': market, 'close': price, 'signal': signal,
+                              'order_id': order['id'] if order else None})
+        return timings, decisions, self.exchange.fills, time.perf_counter() - start
+
+    def run(self, max_candles=None, workers=1):
+        """
+        Replay every stored candle (or the first ``max_candles`` per market) and return the run report.
+
+        With ``workers > 1`` markets are replayed in separate processes (each
+        with its own simulated exchange seeded per market); markets share no
+        state in the live loop, so only wall-clock time changes. The exchange is
+        reset first, so repeated runs on one harness report the same fills.
+        """
+        self.exchange.reset()
+        if workers > 1 and len(self.markets) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(self.markets))) as pool:
+                results = list(pool.map(_replay_market, [(self, market, i, max_candles)
+                                                         for i, market in enumerate(self.markets)]))
+        else:
+            results = [self._replay(self.markets, max_candles)]
+        timings = {stage: [t for result in results for t in result[0][stage]] for stage in STAGES}
+        decisions = pd.DataFrame([d for result in results for d in result[1]])
+        fills = pd.DataFrame([f for result in results for f in result[2]])
+        if decisions.empty:
+            logger.error(f"No history to replay for {self.markets} in {self.source}")
+            return None
+        decisions = decisions.sort_values(['started_at', 'market'], kind='stable').reset_index(drop=True)
+        elapsed = max(result[3] for result in results)
+
+        latency = pd.DataFrame([
+            {'stage': stage, 'count': len(values), 'mean_ms': np.mean(values) * 1e3,
+             'p50_ms': np.percentile(values, 50) * 1e3, 'p95_ms': np.percentile(values, 95) * 1e3,
+             'p99_ms': np.percentile(values, 99) * 1e3, 'max_ms': np.max(values) * 1e3}
+            for stage, values in list(timings.items()) + [('tick', np.sum(list(timings.values()), axis=0))]
+        ]).set_index('stage')
+        report = {'ticks': len(decisions), 'elapsed': elapsed,
+                  'ticks_per_sec': len(decisions) / elapsed if elapsed else 0.0,
+                  'latency': latency, 'decisions': decisions, 'fills': fills}
+        logger.info(f"Replayed {report['ticks']} ticks in {elapsed:.2f}s ({report['ticks_per_sec']:.0f} ticks/s), "
+                    f"{len(fills)} fills")
+        return report
+
+
+def _replay_market(args):
+    """Worker: replay one market with a per-market copy of the simulated exchange."""
+    harness, market, index, max_candles = args
+    harness.exchange.rng = np.random.default_rng([harness.exchange.seed, index])
+    return harness._replay([market], max_candles)
+
+
+def check_latency(report, budgets, percentile='p99_ms'):
+    """Return the stages whose ``percentile`` latency exceeds its budget in ms ({stage: (observed, budget)})."""
+    latency = report['latency']
+    return {stage: (latency.loc[stage, percentile], budget) for stage, budget in budgets.items()
+            if latency.loc[stage, percentile] > budget}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay stored candles through the live trading path.")
+    parser.add_argument('--markets', nargs='+', default=TRADING_MARKETS)
+    parser.add_argument('--source', default='crypto_data.db', help="SQLite DB or CSV history file")
+    parser.add_argument('--speedup', type=float, default=None, help="Candle-time compression; omit for max speed")
+    parser.add_argument('--window', type=int, default=200)
+    parser.add_argument('--max-candles', type=int, default=None, help="Replay only the first N candles per market")
+    parser.add_argument('--workers', type=int, default=1, help="Replay markets in parallel processes")
+    parser.add_argument('--latency-ms', type=float, default=50.0,
+                        help="Simulated order round trip, added to the order stage latency")
+    parser.add_argument('--slippage-bps', type=float, default=2.0)
+    parser.add_argument('--budget', nargs='*', default=[], help="p99 budgets as stage=ms, e.g. tick=25")
+    args = parser.parse_args(argv)
+
+    exchange = SimulatedExchange(latency_ms=args.latency_ms, slippage_bps=args.slippage_bps)
+    harness = ReplayHarness(args.markets, args.source, window=args.window, speedup=args.speedup, exchange=exchange)
+    report = harness.run(max_candles=args.max_candles, workers=args.workers)
+    if report is None:
+        return 1
+    print(f"Replayed {report['ticks']} ticks in {report['elapsed']:.2f}s ({report['ticks_per_sec']:.0f} ticks/s)")
+    print(report['latency'].round(3).to_string())
+    print(f"Fills: {len(report['fills'])}")
+    violations = check_latency(report, {stage: float(ms) for stage, ms in (b.split('=') for b in args.budget)})
+    for stage, (observed, budget) in violations.items():
+        print(f"p99 latency for {stage} is {observed:.2f}ms, over the {budget:.2f}ms budget")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# backtest/robustness.py
+"""
+Block-bootstrap robustness evaluation for strategy signals.
+
+Resamples the candle log-return series and the signal-aligned strategy returns
+(BB, F7, HMM and the F7/HMM combined signal) in contiguous blocks and reports
+percentile confidence intervals for Sharpe, max drawdown and hit rate.
+Resamples are spread over a process pool; the base return arrays live in one
+shared-memory block that workers attach to instead of receiving copies, and
+every chunk of resamples draws from its own child ``SeedSequence`` so results
+do not depend on the number of workers or on scheduling order.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from config import TRADING_MARKETS, CANDLE_RESOLUTION
+from models.bollinger_bands import calculate_bollinger_bands
+from models.formula_7 import calculate_formula_7
+from models.hmm_regime import train_hmm
+from models.kernels import positions_from_signals
+from utils.logger import setup_logger
+from utils.schema import read_market
+
+logger = setup_logger('robustness', 'robustness.log')
+
+PERIODS_PER_YEAR = {
+    '1MIN': 525600, '5MINS': 105120, '15MINS': 35040, '30MINS': 17520,
+    '1HOUR': 8760, '4HOURS': 2190, '1DAY': 365,
+}
+METRICS = ['sharpe', 'max_drawdown', 'hit_rate']
+
+# Per-process view of the shared return matrix, set by _attach_shared
+_shared = {}
+
+
+def load_strategy_returns(market='BTC-USD', db_name='crypto_data.db'):
+    """Return {series name: per-bar log returns} for the candles and each signal."""
+    df = read_market(market, db_name)
+    if df.empty or 'close' not in df.columns:
+        logger.error(f"No data or missing 'close' for {market} in {db_name}")
+        return {}
+    returns = np.log(df['close'] / df['close'].shift(1)).fillna(0).to_numpy()
+    if 'bb_signal' not in df.columns:
+        df = calculate_bollinger_bands(df)
+    if 'f7_signal' not in df.columns:
+        df = calculate_formula_7(df)
+    if 'hmm_signal' not in df.columns:
+        if 'log_returns' not in df.columns or 'volatility' not in df.columns:
+            df['log_returns'] = returns
+            df['volatility'] = df['log_returns'].rolling(window=20).std().fillna(0)
+        df, _ = train_hmm(df)
+    signals = {name: df[f'{name}_signal'].fillna(0).to_numpy()
+               for name in ['bb', 'f7', 'hmm'] if f'{name}_signal' in df.columns}
+    if 'f7' in signals and 'hmm' in signals:
+        combined = np.zeros(len(df))
+        combined[(signals['f7'] == 1) & (signals['hmm'] == 1)] = 1
+        combined[(signals['f7'] == -1) & (signals['hmm'] == -1)] = -1
+        signals['combined'] = combined
+    series = {'candle': returns}
+    for name, signal in signals.items():
+        # A signal at the close of bar t earns the return of bar t + 1
+        positions = positions_from_signals(signal).astype(np.float64)
+        series[name] = np.concatenate(([0.0], positions[:-1])) * returns
+    return series
+
+
+def compute_metrics(returns, periods_per_year=PERIODS_PER_YEAR['5MINS']):
+    """Sharpe, max drawdown and hit rate for each row of a (n_paths, n_bars) log-return array."""
+    returns = np.atleast_2d(returns)
+    mean = returns.mean(axis=1)
+    std = returns.std(axis=1, ddof=1) if returns.shape[1] > 1 else np.zeros(len(returns))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        equity = np.cumsum(returns, axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), 0.0)
+        max_drawdown = np.expm1((equity - peak).min(axis=1))
+        active = (returns != 0).sum(axis=1)
+        hit_rate = np.where(active > 0, (returns > 0).sum(axis=1) / np.maximum(active, 1), np.nan)
+    return np.column_stack([sharpe, max_drawdown, hit_rate])
+
+
+def block_bootstrap(returns, n_resamples, block_size, rng):
+    """Moving-block bootstrap: (n_resamples, len(returns)) array of resampled paths."""
+    n = len(returns)
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n - block_size + 1, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)).reshape(n_resamples, -1)[:, :n]
+    return returns[idx]
+
+
+def _attach_shared(shm_name, shape):
+    """Pool initializer: map the shared return matrix into this worker."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared['shm'] = shm
+    _shared['returns'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _bootstrap_chunk(row, length, n_resamples, block_size, seed_seq, periods_per_year):
+    """Worker task: bootstrap one series from the shared matrix."""
+    returns = _shared['returns'][row, :length]
+    rng = np.random.default_rng(seed_seq)
+    return compute_metrics(block_bootstrap(returns, n_resamples, block_size, rng), periods_per_year)
+
+
+def bootstrap_metrics(series, n_resamples=10000, block_size=20, ci=0.95, seed=42, max_workers=None,
+                      chunk_size=500, periods_per_year=PERIODS_PER_YEAR.get(CANDLE_RESOLUTION, 105120)):
+    """
+    Bootstrap confidence intervals for every series in ``series``.
+
+    ``series`` maps a key (any hashable, e.g. (market, name)) to a 1-D return
+    array. Returns a DataFrame indexed by key and metric with the point
+    estimate on the original series and the ``ci`` percentile interval.
+    """
+    keys = [key for key, returns in series.items() if len(returns) > 1]
+    if not keys:
+        return pd.DataFrame(columns=['series', 'metric', 'point', 'ci_low', 'ci_high'])
+    lengths = [len(series[key]) for key in keys]
+    shape = (len(keys), max(lengths))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        matrix = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for row, key in enumerate(keys):
+            matrix[row, :lengths[row]] = series[key]
+        tasks = []
+        for row, key in enumerate(keys):
+            sizes = [chunk_size] * (n_resamples // chunk_size)
+            if n_resamples % chunk_size:
+                sizes.append(n_resamples % chunk_size)
+            seeds = np.random.SeedSequence([seed, row]).spawn(len(sizes))
+            tasks += [(row, size, seed_seq) for size, seed_seq in zip(sizes, seeds)]
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared,
+                                 initargs=(shm.name, shape)) as pool:
+            futures = [pool.submit(_bootstrap_chunk, row, lengths[row], size, block_size, seed_seq,
+                                   periods_per_year) for row, size, seed_seq in tasks]
+            results = [future.result() for future in futures]
+        points = {key: compute_metrics(matrix[row, :lengths[row]], periods_per_year)[0]
+                  for row, key in enumerate(keys)}
+    finally:
+        shm.close()
+        shm.unlink()
+
+    samples = {key: [] for key in keys}
+    for (row, _, _), result in zip(tasks, results):
+        samples[keys[row]].append(result)
+    tail = (1 - ci) / 2 * 100
+    rows = []
+    for key in keys:
+        stacked = np.concatenate(samples[key])
+        low = np.nanpercentile(stacked, tail, axis=0)
+        high = np.nanpercentile(stacked, 100 - tail, axis=0)
+        for i, metric in enumerate(METRICS):
+            rows.append({'series': key, 'metric': metric, 'point': points[key][i],
+                         'ci_low': low[i], 'ci_high': high[i]})
+    return pd.DataFrame(rows)
+
+
+def evaluate_robustness(markets=TRADING_MARKETS, db_name='crypto_data.db', n_resamples=10000, block_size=20,
+                        ci=0.95, seed=42, max_workers=None):
+    """Bootstrap Sharpe / max drawdown / hit rate CIs for every market and signal."""
+    series = {}
+    for market in markets:
+        try:
+            for name, returns in load_strategy_returns(market, db_name).items():
+                series[(market, name)] = returns
+        except Exception as e:
+            logger.error(f"Error loading returns for {market}: {e}")
+            print(f"Error loading returns for {market}: {e}")
+    report = bootstrap_metrics(series, n_resamples=n_resamples, block_size=block_size, ci=ci, seed=seed,
+                               max_workers=max_workers)
+    if report.empty:
+        logger.error(f"No return series to evaluate for {markets}")
+        return report
+    report.insert(0, 'market', [key[0] for key in report['series']])
+    report['series'] = [key[1] for key in report['series']]
+    logger.info(f"Bootstrapped {n_resamples} resamples for {len(series)} series across {len(markets)} markets")
+    return report
+
+
+if __name__ == "__main__":
+    import time
+    start = time.perf_counter()
+    result = evaluate_robustness()
+    print(result.to_string(index=False))
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,67 @@
+# benchmarks/bench_kernels.py
+"""Per-kernel timings: pandas/Python reference vs NumPy fallback vs Numba."""
+import time
+import numpy as np
+import pandas as pd
+from models import kernels
+
+
+def _best_of(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _f7_pandas(returns, lookback):
+    pos = returns.apply(lambda x: x if x > 0 else 0)
+    neg = returns.apply(lambda x: x if x < 0 else 0)
+    pos.rolling(window=lookback).apply(lambda x: (x > 0).sum() / lookback, raw=True)
+    neg.rolling(window=lookback).apply(lambda x: (x < 0).sum() / lookback, raw=True)
+    pos.rolling(window=lookback).apply(lambda x: x[x > 0].mean() if (x > 0).sum() > 0 else 0, raw=True)
+    neg.rolling(window=lookback).apply(lambda x: x[x < 0].mean() if (x < 0).sum() > 0 else 0, raw=True)
+
+
+def run(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    high = close * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = close * (1 - np.abs(rng.normal(0, 0.002, n)))
+    signals = rng.choice([-1, 0, 0, 0, 1], size=n).astype(float)
+    returns = pd.Series(close).pct_change()
+    hmm_args = (np.log(np.full(2, 0.5)), np.log(np.full((2, 2), 0.5)), rng.normal(size=(n, 2)))
+
+    cases = {
+        'f7_rolling_stats': (lambda: _f7_pandas(returns, 20),
+                             lambda: kernels._f7_rolling_stats_numpy(returns.to_numpy(), 20),
+                             kernels._f7_rolling_stats_numba and (lambda: kernels._f7_rolling_stats_numba(returns.to_numpy(), 20))),
+        'positions_from_signals': (lambda: kernels._positions_from_signals_py(signals),
+                                   lambda: kernels._positions_from_signals_numpy(signals),
+                                   kernels._positions_from_signals_numba and (lambda: kernels._positions_from_signals_numba(signals))),
+        'hmm_forward': (lambda: kernels._hmm_forward_py(*hmm_args),
+                        lambda: kernels._hmm_forward_numpy(*hmm_args),
+                        kernels._hmm_forward_numba and (lambda: kernels._hmm_forward_numba(*hmm_args))),
+        'apply_stop_target': (lambda: kernels._stop_target_py(signals, high, low, close, 0.005, 0.01),
+                              lambda: kernels._stop_target_numpy(signals, high, low, close, 0.005, 0.01),
+                              kernels._stop_target_numba and (lambda: kernels._stop_target_numba(signals, high, low, close, 0.005, 0.01))),
+    }
+
+    print(f"{n} bars, numba available: {kernels.NUMBA_AVAILABLE}")
+    print(f"{'kernel':<24}{'reference':>12}{'numpy':>12}{'numba':>12}{'numpy x':>10}{'numba x':>10}")
+    for name, (reference, numpy_impl, numba_impl) in cases.items():
+        ref_t = _best_of(reference, repeat=1)
+        np_t = _best_of(numpy_impl)
+        if numba_impl:
+            numba_impl()  # load from the on-disk cache or compile once
+            nb_t = _best_of(numba_impl)
+            nb_time, nb_speedup = f"{nb_t * 1e3:.2f}ms", f"{ref_t / nb_t:.1f}x"
+        else:
+            nb_time, nb_speedup = '-', '-'
+        print(f"{name:<24}{ref_t * 1e3:>10.2f}ms{np_t * 1e3:>10.2f}ms{nb_time:>12}"
+              f"{ref_t / np_t:>9.1f}x{nb_speedup:>10}")
+
+
+if __name__ == "__main__":
+    run()
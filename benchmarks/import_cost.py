@@ -0,0 +1,118 @@
+# benchmarks/import_cost.py
+"""
+Cold-start import cost of the bot's modules.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``.
+The report lists its cumulative import time, the heavy optional dependencies
+it pulled in, and its most expensive transitive imports. ``--check`` exits
+non-zero when a module goes over its budget in ``IMPORT_BUDGETS_MS`` or
+imports a heavy dependency at module level. Heavy dependencies belong inside
+the functions that use them.
+
+Usage: python -m benchmarks.import_cost [module ...] [--top N] [--check]
+"""
+import argparse
+import subprocess
+import sys
+
+# Cumulative import budgets in ms. Most modules need pandas, which costs
+# ~300ms on its own.
+IMPORT_BUDGETS_MS = {
+    'config': 50,
+    'execution': 100,
+    'utils.telegram_alerts': 100,
+    'models.kernels': 300,
+    'utils.schema': 700,
+    'utils.feature_cache': 700,
+    'data_pipeline': 800,
+    'models.bollinger_bands': 700,
+    'models.formula_7': 700,
+    'models.hmm_regime': 700,
+    'models.f7_hmm_signals': 700,
+    'models.lstm_runtime': 700,
+    'models.lstm_trainer': 700,
+    'models.lstm_walkforward': 700,
+    'backtest.replay': 800,
+    'backtest.robustness': 800,
+}
+# Packages that only the functions needing them may import
+HEAVY_MODULES = ['tensorflow', 'keras', 'hmmlearn', 'sklearn', 'scipy', 'ccxt', 'numba', 'streamlit']
+
+
+def import_profile(module):
+    """(name, self_us, cumulative_us, depth) for every module loaded by ``import module`` in a fresh interpreter."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ImportError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def import_cost(module, top=5):
+    """Cumulative import time (ms), heavy dependencies loaded and the ``top`` costliest transitive imports."""
+    rows = import_profile(module)
+    # importtime lists children before their parent; keep only the subtree of ``module``
+    end = max(i for i, (name, _, _, depth) in enumerate(rows) if name == module and depth == 0)
+    start = max([i + 1 for i, row in enumerate(rows[:end]) if row[3] == 0], default=0)
+    total = rows[end][2] / 1e3
+    rows = rows[start:end]
+    loaded = {name.split('.')[0] for name, _, _, _ in rows}
+    heavy = [pkg for pkg in HEAVY_MODULES if pkg in loaded]
+    costliest = sorted(((name, cumulative / 1e3) for name, _, cumulative, depth in rows if depth == 1),
+                       key=lambda item: -item[1])[:top]
+    return {'module': module, 'ms': total, 'heavy': heavy, 'costliest': costliest}
+
+
+def check_budgets(budgets=IMPORT_BUDGETS_MS, retries=2):
+    """{module: problem} for every module over budget or importing a heavy dependency at module level."""
+    problems = {}
+    for module, budget in budgets.items():
+        cost = import_cost(module)
+        # Re-measure before reporting a time overrun; a single cold run can hit a slow disk
+        for _ in range(retries):
+            if cost['ms'] <= budget:
+                break
+            cost = min(cost, import_cost(module), key=lambda c: c['ms'])
+        if cost['heavy']:
+            problems[module] = f"imports {', '.join(cost['heavy'])} at module level"
+        elif cost['ms'] > budget:
+            problems[module] = f"{cost['ms']:.0f}ms over the {budget}ms budget"
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module cold-start import cost.")
+    parser.add_argument('modules', nargs='*', default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument('--top', type=int, default=3, help="Costliest direct imports to list per module")
+    parser.add_argument('--check', action='store_true', help="Exit 1 if a module breaks its budget")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<28}{'ms':>8}{'budget':>8}  costliest imports")
+    for module in args.modules:
+        try:
+            cost = import_cost(module, args.top)
+        except ImportError as e:
+            print(f"{module:<28}{'-':>8}{'-':>8}  {str(e).splitlines()[-1]}")
+            continue
+        budget = IMPORT_BUDGETS_MS.get(module, '-')
+        costliest = ', '.join(f"{name} {ms:.0f}ms" for name, ms in cost['costliest'])
+        heavy = f"  [heavy: {', '.join(cost['heavy'])}]" if cost['heavy'] else ''
+        print(f"{module:<28}{cost['ms']:>8.0f}{budget:>8}  {costliest}{heavy}")
+    if args.check:
+        problems = check_budgets({module: IMPORT_BUDGETS_MS[module] for module in args.modules
+                                  if module in IMPORT_BUDGETS_MS})
+        for module, problem in problems.items():
+            print(f"{module}: {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
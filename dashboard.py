@@ -4,8 +4,7 @@ import sqlite3
 from data_pipeline import fetch_data
 from config import TRADING_MARKETS
 from utils.logger import setup_logger
-from models.lstm_model import backtest_lstm
-from models.bollinger_bands import backtest_bollinger_bands
+from utils.schema import read_market, write_market, to_datetime
 
 logger = setup_logger('dashboard', 'dashboard.log')
 
@@ -15,10 +14,8 @@ market = st.selectbox("Select Market", TRADING_MARKETS)
 df = pd.DataFrame()
 
 try:
-    conn = sqlite3.connect('crypto_data.db', isolation_level=None)
     table_name = market.replace('-', '_') + '_data'
-    df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
-    conn.close()
+    df = read_market(market, 'crypto_data.db')
     if df.empty or 'started_at' not in df.columns:
         logger.warning(f"No data or missing 'started_at' in SQLite for {market}")
         st.warning(f"No usable data in SQLite for {market}. Falling back to live API fetch...")
@@ -35,9 +32,7 @@ try:
             else:
                 logger.info(f"Fetched {len(df)} live rows for {market}")
                 st.success(f"Fetched {len(df)} live rows for {market}")
-                conn = sqlite3.connect('crypto_data.db', isolation_level=None)
-                df.to_sql(table_name, conn, if_exists='replace', index=False)
-                conn.close()
+                write_market(df, market, 'crypto_data.db')
         except Exception as e:
             logger.error(f"Error fetching live data for {market}: {e}")
             st.error(f"Error fetching live data: {e}")
@@ -51,7 +46,7 @@ except Exception as e:
     df = pd.DataFrame()
 
 if not df.empty and 'started_at' in df.columns:
-    df['started_at'] = pd.to_datetime(df['started_at'])
+    df['started_at'] = to_datetime(df['started_at'])
     df_for_plotting = df.set_index('started_at')
     st.subheader("Market Data")
     st.metric("Latest Close", f"${df['close'].iloc[-1]:.2f}")
@@ -63,8 +58,8 @@ if not df.empty and 'started_at' in df.columns:
         available_columns = pd.read_sql(f"PRAGMA table_info({table_name})", conn)['name'].tolist()
         signal_columns = [col for col in ['f7_signal', 'regime', 'hmm_signal', 'lstm_signal', 'bb_signal'] if col in available_columns]
         if signal_columns:
-            df_signals = pd.read_sql(f"SELECT started_at, {', '.join(signal_columns)} FROM {table_name}", conn)
             conn.close()
+            df_signals = read_market(market, 'crypto_data.db', columns=['started_at'] + signal_columns)
             if not df_signals.empty:
                 st.subheader("Trading Signals")
                 if 'f7_signal' in signal_columns:
@@ -78,7 +73,7 @@ if not df.empty and 'started_at' in df.columns:
                 # Fixed signal chart
                 signal_plot_columns = [col for col in ['f7_signal', 'hmm_signal', 'lstm_signal', 'bb_signal'] if col in df_signals.columns]
                 if signal_plot_columns:
-                    df_signals['started_at'] = pd.to_datetime(df_signals['started_at'])
+                    df_signals['started_at'] = to_datetime(df_signals['started_at'])
                     st.line_chart(df_signals.set_index('started_at')[signal_plot_columns], height=200, use_container_width=True, color=["#FFA500", "#800080", "#008000", "#0000FF"])
                 st.write("Sample Data with Signals", df_signals.tail())
             else:
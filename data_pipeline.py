@@ -1,18 +1,12 @@
 import pandas as pd
 import numpy as np
-import sqlite3
 import requests
 from datetime import datetime, timedelta
-import logging
 from config import INDEXER_URL, TRADING_MARKETS, CANDLE_RESOLUTION
+from utils.logger import setup_logger
+from utils.schema import write_market
 
-# Setup logging
-logging.basicConfig(
-    filename='data_pipeline.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger('data_pipeline')
+logger = setup_logger('data_pipeline', 'data_pipeline.log')
 
 def get_available_markets(indexer_url=INDEXER_URL):
     """Fetch available perpetual markets from dYdX v4 mainnet."""
@@ -30,6 +24,27 @@ def get_available_markets(indexer_url=INDEXER_URL):
         print(f"Error fetching markets from {indexer_url}: {e}")
         return []
 
+def candles_to_frame(candles):
+    """Convert indexer candle dicts into the OHLCV frame (with log returns and volatility) the models use."""
+    started_at = pd.to_datetime([candle.get('startedAt', pd.NaT) for candle in candles], format='ISO8601')
+    if started_at.isna().all():
+        return pd.DataFrame()
+    order = np.lexsort((started_at.asi8, started_at.isna()))  # chronological, missing timestamps last
+    # Schema dtypes (utils.schema): epoch-ms timestamps, float64 prices, float32 derived values
+    columns = {'started_at': started_at[order].as_unit('ms').asi8}
+    for col, key in [('open', 'open'), ('high', 'high'), ('low', 'low'), ('close', 'close'),
+                     ('base_token_volume', 'baseTokenVolume')]:
+        columns[col] = np.array([float(candle.get(key, 0)) for candle in candles])[order]
+    columns['base_token_volume'] = columns['base_token_volume'].astype(np.float32)
+    # Derived columns are computed on arrays so the frame is built in one go
+    close = columns['close']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_returns = np.concatenate(([0.0], np.log(close[1:] / close[:-1]))) if len(close) else close
+    log_returns = np.where(np.isnan(log_returns), 0.0, log_returns)
+    columns['log_returns'] = log_returns.astype(np.float32)
+    columns['volatility'] = pd.Series(log_returns).rolling(window=20).std().fillna(0).to_numpy(np.float32)
+    return pd.DataFrame(columns)
+
 def fetch_data(market='BTC-USD', timeframe=CANDLE_RESOLUTION, limit=200, indexer_url=INDEXER_URL, return_raw=False):
     """Fetch OHLCV candles from dYdX v4 mainnet via REST API."""
     timeframes = [timeframe, '1MIN']
@@ -52,22 +67,11 @@ def fetch_data(market='BTC-USD', timeframe=CANDLE_RESOLUTION, limit=200, indexer
                     logger.warning(f"No candles returned for {mkt} at {url} with {tf}")
                     print(f"No candles returned for {mkt} at {url} with {tf}")
                     continue
-                df = pd.DataFrame([{
-                    'started_at': candle.get('startedAt', pd.NaT),
-                    'open': float(candle.get('open', 0)),
-                    'high': float(candle.get('high', 0)),
-                    'low': float(candle.get('low', 0)),
-                    'close': float(candle.get('close', 0)),
-                    'base_token_volume': float(candle.get('baseTokenVolume', 0))
-                } for candle in candles])
-                if df['started_at'].isna().all():
+                df = candles_to_frame(candles)
+                if df.empty:
                     logger.error(f"No valid 'startedAt' in data for {mkt}")
                     print(f"No valid 'startedAt' in data for {mkt}")
                     continue
-                df['started_at'] = pd.to_datetime(df['started_at'])
-                df = df.sort_values('started_at').reset_index(drop=True)
-                df['log_returns'] = np.log(df['close'] / df['close'].shift(1)).fillna(0)
-                df['volatility'] = df['log_returns'].rolling(window=20).std().fillna(0)
                 logger.info(f"Fetched {len(df)} candles for {mkt} at {url} with {tf}")
                 print(f"Fetched {len(df)} candles for {mkt} at {url} with {tf}")
                 return df
@@ -88,10 +92,7 @@ def save_to_db(df, market='BTC-USD', db_name='crypto_data.db'):
         print(f"No data to save for {market}")
         return
     try:
-        conn = sqlite3.connect(db_name)
-        table_name = f'{market.replace("-", "_")}_data'
-        df.to_sql(table_name, conn, if_exists='replace', index=False)
-        conn.close()
+        write_market(df, market, db_name)
         logger.info(f"Saved {len(df)} rows for {market} to {db_name}")
         print(f"Saved {len(df)} rows for {market} to {db_name}")
     except Exception as e:
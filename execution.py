@@ -1,13 +1,14 @@
 # execution.py
-import ccxt
 from config import TESTNET_INDEXER_URL
 from utils.logger import setup_logger
+from utils.telegram_alerts import send_alert
 
 logger = setup_logger('execution', 'execution.log')
 
 def initialize_exchange():
     """Initialize dYdX testnet exchange."""
     try:
+        import ccxt
         exchange = ccxt.dydx({
             'apiKey': 'YOUR_TESTNET_API_KEY',
             'secret': 'YOUR_TESTNET_API_SECRET',
@@ -20,15 +21,30 @@ def initialize_exchange():
         logger.error(f"Error initializing exchange: {e}")
         return None
 
-def place_order(market, side, size, price):
-    """Place a market/limit order on dYdX testnet."""
-    exchange = initialize_exchange()
+def place_order(market, side, size, price, exchange=None):
+    """Place a market/limit order on dYdX testnet (or on ``exchange`` when given, e.g. a simulator)."""
+    live = exchange is None
+    if live:
+        exchange = initialize_exchange()
     if exchange:
         try:
             order = exchange.create_order(market, 'limit', side, size, price)
             logger.info(f"Placed {side} order for {size} {market} at {price}")
+            # Alerts are queued after the order is sent and never wait on the network
+            if live:
+                send_alert(f"Placed {side} order for {size} {market} at {price}", key=market)
             return order
         except Exception as e:
             logger.error(f"Error placing order for {market}: {e}")
+            if live:
+                send_alert(f"Error placing {side} order for {market}: {e}", key=market)
             return None
-    return None
\ No newline at end of file
+    return None
+
+def execute_signal(market, signal, price, size=0.01, exchange=None):
+    """Turn a model signal into an order: 1 buys, -1 sells, 0 does nothing."""
+    if signal == 1:
+        return place_order(market, 'buy', size, price, exchange=exchange)
+    if signal == -1:
+        return place_order(market, 'sell', size, price, exchange=exchange)
+    return None
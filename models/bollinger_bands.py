@@ -1,9 +1,13 @@
 import pandas as pd
+from utils.feature_cache import get_cache
 from utils.logger import setup_logger
 import sqlite3
+from utils.schema import read_market, write_market
 
 logger = setup_logger('bollinger_bands', 'bollinger_bands.log')
 
+BB_COLUMNS = ['ma20', 'std20', 'upper_band', 'lower_band', 'bb_signal']
+
 def calculate_bollinger_bands(df, window=20, num_std=2):
     """Calculate Bollinger Bands and generate signals."""
     logger.info(f"Applying Bollinger Bands to {len(df)} rows with window={window}, num_std={num_std}")
@@ -16,24 +20,29 @@ def calculate_bollinger_bands(df, window=20, num_std=2):
     df.loc[df['close'] < df['lower_band'], 'bb_signal'] = 1  # Buy
     return df
 
-def backtest_bollinger_bands(market='BTC-USD', db_name='crypto_data.db'):
+def backtest_bollinger_bands(market='BTC-USD', db_name='crypto_data.db', conn=None, window=20, num_std=2):
     """Backtest Bollinger Bands on market data."""
     try:
-        conn = sqlite3.connect(db_name, isolation_level=None)
-        df = pd.read_sql(f"SELECT * FROM {market.replace('-', '_')}_data", conn)
-        conn.close()
+        close_conn = conn is None
+        if close_conn:
+            conn = sqlite3.connect(db_name, isolation_level=None)
+        df = read_market(market, conn=conn)
         if df.empty or 'started_at' not in df.columns:
             logger.error(f"No data or missing 'started_at' for {market} in {db_name}")
+            if close_conn:
+                conn.close()
             return pd.DataFrame()
-        df = calculate_bollinger_bands(df)
+        df = get_cache().apply(df, market, 'bollinger_bands', calculate_bollinger_bands,
+                               params={'window': window, 'num_std': num_std}, output_cols=BB_COLUMNS,
+                               warmup=window)
         logger.info(f"Backtested Bollinger Bands for {market}: {df['bb_signal'].value_counts().to_dict()}")
         print(f"Bollinger Bands signals for {market}: {df['bb_signal'].value_counts().to_dict()}")
-        conn = sqlite3.connect(db_name, isolation_level=None)
-        df.to_sql(f"{market.replace('-', '_')}_data", conn, if_exists='replace', index=False)
-        conn.close()
+        write_market(df, market, conn=conn)
+        if close_conn:
+            conn.close()
         logger.info(f"Saved {len(df)} rows with BB signals for {market} to {db_name}")
         return df
     except Exception as e:
         logger.error(f"Error backtesting Bollinger Bands for {market}: {e}")
         print(f"Error backtesting Bollinger Bands for {market}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
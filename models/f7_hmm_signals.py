@@ -1,13 +1,12 @@
 import sqlite3
 import pandas as pd
 import multiprocessing as mp
+import os
+from models.lstm_runtime import WEIGHTS_DIR, weights_path
 from utils.logger import setup_logger
 
-# Import only non-TF models at the top level
-from models.bollinger_bands import backtest_bollinger_bands
-from models.formula_7 import backtest_formula_7
-from models.hmm_regime import backtest_hmm
-from execution import place_order
+# Model and execution modules are imported inside the functions that use them,
+# so importing this module (or spawning the LSTM process) stays cheap
 
 logger = setup_logger('strategy', 'strategy.log')
 
@@ -16,6 +15,9 @@ def combine_signals(market='BTC-USD'):
     """
     Combines signals from Formula 7 and HMM into a single dataframe.
     """
+    from models.formula_7 import backtest_formula_7
+    from models.hmm_regime import backtest_hmm
+
     df_f7 = backtest_formula_7(market)
     df_hmm = backtest_hmm(market)
 
@@ -37,7 +39,7 @@ def combine_signals(market='BTC-USD'):
     return df
 
 
-def _run_lstm_in_process(market, queue):
+def _run_lstm_in_process(market, queue, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
     """
     Runs the LSTM backtest in a separate process to avoid TensorFlow deadlocks.
     """
@@ -46,13 +48,16 @@ def _run_lstm_in_process(market, queue):
         import tensorflow as tf
         import keras
         from models.lstm_model import backtest_lstm
+        from models.bollinger_bands import backtest_bollinger_bands
+        from models.formula_7 import backtest_formula_7
+        from models.hmm_regime import backtest_hmm
 
         # Run supporting models first (if they are prerequisites for LSTM data)
-        backtest_bollinger_bands(market)
-        backtest_hmm(market)
-        backtest_formula_7(market)
+        backtest_bollinger_bands(market, db_name)
+        backtest_hmm(market, db_name)
+        backtest_formula_7(market, db_name)
 
-        df = backtest_lstm(market)
+        df = backtest_lstm(market, db_name, weights_dir=weights_dir)
         queue.put(df)
 
     except Exception as e:
@@ -60,42 +65,83 @@ def _run_lstm_in_process(market, queue):
         queue.put(pd.DataFrame())
 
 
-def execute_trades(market='BTC-USD'):
+def _predict_with_runtime(market, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
     """
-    Executes trades by running the LSTM model in an isolated process.
+    Latest LSTM signal and close from the exported weights, without TensorFlow.
     """
-    logger.info(f"Starting the trading strategy for {market}...")
+    from models.bollinger_bands import backtest_bollinger_bands
+    from models.formula_7 import backtest_formula_7
+    from models.hmm_regime import backtest_hmm
+    from models.lstm_runtime import LSTMRuntime
+    from utils.schema import read_market
+
+    # Refresh the supporting signals the LSTM uses as features
+    backtest_bollinger_bands(market, db_name)
+    backtest_hmm(market, db_name)
+    backtest_formula_7(market, db_name)
+
+    df = read_market(market, db_name)
+    runtime = LSTMRuntime.load_markets([market], weights_dir)
+    _, signal = runtime.predict({market: df})[market]
+    return signal, df['close'].iloc[-1]
+
 
+def _predict_in_process(market, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
+    """
+    Latest LSTM signal and close from a TensorFlow subprocess that (re)trains the model.
+    """
     # Use a Queue to get the result from the child process
     q = mp.Queue()
 
     # Run the LSTM process safely with spawn
-    p = mp.Process(target=_run_lstm_in_process, args=(market, q))
+    p = mp.Process(target=_run_lstm_in_process, args=(market, q, db_name, weights_dir))
     p.start()
     p.join()
 
     # Get result
     if q.empty():
         logger.error("No result returned from LSTM process.")
-        return
+        return None
 
     df = q.get()
 
     if df.empty or 'lstm_signal' not in df.columns:
         logger.error(f"Final dataframe from LSTM process is empty or missing signals. Cannot execute trade.")
+        return None
+    return df['lstm_signal'].iloc[-1], df['close'].iloc[-1]
+
+
+def execute_trades(market='BTC-USD', db_name='crypto_data.db', weights_dir=WEIGHTS_DIR, retrain=False):
+    """
+    Executes trades on the latest LSTM signal.
+
+    Exported weights are run with the NumPy runtime in this process; the
+    TensorFlow subprocess is only started to retrain or when no weights exist.
+    """
+    from execution import execute_signal
+
+    logger.info(f"Starting the trading strategy for {market}...")
+
+    result = None
+    if not retrain and os.path.exists(weights_path(market, weights_dir)):
+        try:
+            result = _predict_with_runtime(market, db_name, weights_dir)
+        except Exception as e:
+            logger.error(f"LSTM runtime prediction failed for {market}, falling back to TensorFlow: {e}")
+    if result is None:
+        result = _predict_in_process(market, db_name, weights_dir)
+    if result is None:
         return
 
-    latest_signal = df['lstm_signal'].iloc[-1]
-    latest_price = df['close'].iloc[-1]
+    latest_signal, latest_price = result
 
     if latest_signal == 1:
         logger.info(f"BUY signal generated by LSTM for {market} at ${latest_price:.2f}")
-        place_order(market, 'buy', 0.01, latest_price)
     elif latest_signal == -1:
         logger.info(f"SELL signal generated by LSTM for {market} at ${latest_price:.2f}")
-        place_order(market, 'sell', 0.01, latest_price)
     else:
         logger.info(f"No trade signal generated by LSTM for {market}.")
+    execute_signal(market, latest_signal, latest_price)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,18 @@
 import pandas as pd
 import numpy as np
 import sqlite3
+from models.kernels import f7_rolling_stats
+from utils.feature_cache import get_cache
 from utils.logger import setup_logger
+from utils.schema import read_market, write_market
 
 logger = setup_logger('formula_7', 'formula_7.log')
 
+F7_COLUMNS = ['returns', 'positive_returns', 'negative_returns', 'prob_high', 'prob_low', 'ret_high', 'ret_low',
+              'f7_value', 'f7_signal']
+# Part of the feature cache key; bump when models.kernels.f7_rolling_stats changes its output
+F7_VERSION = 1
+
 
 def calculate_formula_7(df, lookback=20):
     """
@@ -14,56 +22,60 @@ def calculate_formula_7(df, lookback=20):
     logger.info(f"Calculating Formula 7 for {len(df)} rows with lookback={lookback}")
 
     # Calculate daily returns for direction and magnitude
-    df['returns'] = df['close'].pct_change()
+    returns = df['close'].pct_change().to_numpy()
 
     # Use a rolling window to calculate the components
-    df['positive_returns'] = df['returns'].apply(lambda x: x if x > 0 else 0)
-    df['negative_returns'] = df['returns'].apply(lambda x: x if x < 0 else 0)
-
-    # Calculate "Prob of high" and "Prob of low"
-    df['prob_high'] = df['positive_returns'].rolling(window=lookback).apply(lambda x: (x > 0).sum() / lookback,
-                                                                            raw=True)
-    df['prob_low'] = df['negative_returns'].rolling(window=lookback).apply(lambda x: (x < 0).sum() / lookback, raw=True)
+    positive_returns = np.where(returns > 0, returns, 0.0)
+    negative_returns = np.where(returns < 0, returns, 0.0)
 
-    # Calculate "ret of high" and "ret of low"
-    df['ret_high'] = df['positive_returns'].rolling(window=lookback).apply(
-        lambda x: x[x > 0].mean() if (x > 0).sum() > 0 else 0, raw=True)
-    df['ret_low'] = df['negative_returns'].rolling(window=lookback).apply(
-        lambda x: x[x < 0].mean() if (x < 0).sum() > 0 else 0, raw=True)
+    # Calculate "Prob of high"/"Prob of low" and "ret of high"/"ret of low" in one compiled pass
+    prob_high, prob_low, ret_high, ret_low = f7_rolling_stats(returns, lookback)
 
     # Calculate the final Formula 7 value
-    df['f7_value'] = ((df['prob_high'] * df['ret_high']) - (
-                df['prob_low'] * df['ret_low'])) / 2  # Using n=2 as a default
+    f7_value = ((prob_high * ret_high) - (prob_low * ret_low)) / 2  # Using n=2 as a default
 
     # Generate signals based on the value
-    df['f7_signal'] = 0
-    df.loc[df['f7_value'] > 0.0001, 'f7_signal'] = 1  # Buy
-    df.loc[df['f7_value'] < -0.0001, 'f7_signal'] = -1  # Sell
+    f7_signal = np.zeros(len(df), dtype=np.int64)
+    f7_signal[f7_value > 0.0001] = 1  # Buy
+    f7_signal[f7_value < -0.0001] = -1  # Sell
+
+    # Attach all columns at once; inserting them one by one dominates the cost on short windows
+    features = pd.DataFrame({
+        'returns': returns, 'positive_returns': positive_returns, 'negative_returns': negative_returns,
+        'prob_high': prob_high, 'prob_low': prob_low, 'ret_high': ret_high, 'ret_low': ret_low,
+        'f7_value': f7_value, 'f7_signal': f7_signal,
+    }, index=df.index)
+    df = pd.concat([df.drop(columns=features.columns, errors='ignore'), features], axis=1)
 
     return df
 
 
-def backtest_formula_7(market='BTC-USD', db_name='crypto_data.db'):
+def backtest_formula_7(market='BTC-USD', db_name='crypto_data.db', conn=None, lookback=20):
     """Backtest Formula 7 on market data."""
     try:
-        conn = sqlite3.connect(db_name)
-        df = pd.read_sql(f"SELECT * FROM {market.replace('-', '_')}_data", conn)
-        conn.close()
+        close_conn = conn is None
+        if close_conn:
+            conn = sqlite3.connect(db_name)
+        df = read_market(market, conn=conn)
 
         if df.empty or 'started_at' not in df.columns:
             logger.error(f"No data or missing 'started_at' for {market}")
+            if close_conn:
+                conn.close()
             return pd.DataFrame()
 
-        df = calculate_formula_7(df)
+        # pct_change needs one row before the first full lookback window
+        df = get_cache().apply(df, market, 'formula_7', calculate_formula_7, params={'lookback': lookback},
+                               output_cols=F7_COLUMNS, warmup=lookback + 1, version=F7_VERSION)
         df.loc[df['f7_value'].isnull(), 'f7_value'] = 0
         df.loc[df['f7_signal'].isnull(), 'f7_signal'] = 0
 
-        conn = sqlite3.connect(db_name)
-        df.to_sql(f"{market.replace('-', '_')}_data", conn, if_exists='replace', index=False)
-        conn.close()
+        write_market(df, market, conn=conn)
+        if close_conn:
+            conn.close()
         logger.info(f"Saved {len(df)} rows with Formula 7 signals for {market} to {db_name}")
         return df
 
     except Exception as e:
         logger.error(f"Error backtesting Formula 7 for {market}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
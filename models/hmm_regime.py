@@ -1,15 +1,21 @@
 import pandas as pd
 import numpy as np
-from hmmlearn.hmm import GaussianHMM
+from models.kernels import hmm_forward
+from utils.feature_cache import code_version, get_cache
 from utils.logger import setup_logger
+from utils.schema import read_market, write_market
 import sqlite3
 
 logger = setup_logger('hmm_regime', 'hmm_regime.log')
 
+HMM_INPUTS = ['log_returns', 'volatility']
+
 def train_hmm(df, n_states=2):
     """Train HMM to detect market regimes and generate signals."""
     logger.info(f"Training HMM on {len(df)} rows with {n_states} states")
     try:
+        # hmmlearn pulls in sklearn/scipy (~1s), so it is only imported when a model is fitted
+        from hmmlearn.hmm import GaussianHMM
         X = df[['log_returns', 'volatility']].copy()
         X['log_returns'] = X['log_returns'] + np.random.normal(0, 1e-6, len(X))
         X['volatility'] = X['volatility'] + np.random.normal(0, 1e-6, len(X))
@@ -36,6 +42,39 @@ def train_hmm(df, n_states=2):
         print(f"Error training HMM: {e}")
         return df, None
 
+def fit_regime_params(df, n_states=2):
+    """
+    Fit the regime HMM on ``df`` alone and return its parameters as arrays.
+
+    Same model as ``train_hmm``, with the standardisation taken from ``df`` too,
+    so ``filtered_hmm_signal`` can label later candles without refitting.
+    """
+    from hmmlearn.hmm import GaussianHMM
+    X = df[HMM_INPUTS].to_numpy(dtype=np.float64)
+    if len(X) < n_states * 2:
+        raise ValueError(f"Insufficient data for HMM: {len(X)} rows")
+    mean, std = X.mean(axis=0), X.std(axis=0) + 1e-8
+    model = GaussianHMM(n_components=n_states, covariance_type="diag", n_iter=200, init_params='stmc', random_state=42)
+    model.fit((X - mean) / std)
+    return {'mean': mean, 'std': std, 'startprob': model.startprob_, 'transmat': model.transmat_,
+            'means': model.means_, 'vars': model._covars_}
+
+def filtered_hmm_signal(params, df):
+    """
+    Causal HMM signals for ``df`` from ``fit_regime_params`` output.
+
+    Each row takes the most likely state of the filtered (forward-pass)
+    distribution, which only uses that row and the ones before it, unlike
+    Viterbi decoding. Regime 0 is a buy (1), anything else a sell (-1).
+    """
+    z = (df[HMM_INPUTS].to_numpy(dtype=np.float64) - params['mean']) / params['std']
+    var = params['vars']
+    log_frameprob = -0.5 * (np.log(2 * np.pi * var).sum(axis=1)
+                            + ((z[:, None, :] - params['means'][None]) ** 2 / var[None]).sum(axis=2))
+    with np.errstate(divide='ignore'):
+        log_alpha, _ = hmm_forward(np.log(params['startprob']), np.log(params['transmat']), log_frameprob)
+    return np.where(log_alpha.argmax(axis=1) == 0, 1, -1).astype(np.int8)
+
 def backtest_hmm(market='BTC-USD', db_name='crypto_data.db', conn=None):
     """Backtest HMM on market data."""
     try:
@@ -44,20 +83,25 @@ def backtest_hmm(market='BTC-USD', db_name='crypto_data.db', conn=None):
             close_conn = True
         else:
             close_conn = False
-        df = pd.read_sql(f"SELECT * FROM {market.replace('-', '_')}_data", conn)
+        df = read_market(market, conn=conn)
         if close_conn:
             conn.close()
         if df.empty or 'started_at' not in df.columns:
             logger.error(f"No data or missing 'started_at' for {market} in {db_name}")
             return pd.DataFrame()
-        df, model = train_hmm(df)
-        if model is None:
+        # The HMM is fit on the whole history, so appended candles invalidate it (no warmup)
+        df = get_cache().apply(df, market, 'hmm_regime', lambda d: train_hmm(d)[0],
+                               input_cols=['log_returns', 'volatility'], output_cols=['regime', 'hmm_signal'],
+                               version=code_version(train_hmm))
+        if 'hmm_signal' not in df.columns:
             return df
         logger.info(f"Backtested HMM for {market}: {df['hmm_signal'].value_counts().to_dict()}")
         print(f"Backtested HMM for {market}: {df['hmm_signal'].value_counts().to_dict()}")
-        conn = sqlite3.connect(db_name)
-        df.to_sql(f"{market.replace('-', '_')}_data", conn, if_exists='replace', index=False)
-        conn.close()
+        if close_conn:
+            conn = sqlite3.connect(db_name)
+        write_market(df, market, conn=conn)
+        if close_conn:
+            conn.close()
         logger.info(f"Saved {len(df)} rows with HMM signals for {market} to {db_name}")
         return df
     except Exception as e:
@@ -0,0 +1,293 @@
+# models/kernels.py
+"""
+Compiled kernels for the hot loops that pandas cannot express cleanly.
+
+Every kernel has a pure-NumPy implementation (``_<name>_numpy``) and, when
+Numba is installed, a nopython implementation (``_<name>_numba``) compiled with
+``cache=True`` so the machine code is written next to this module and later
+processes skip the JIT cost. The public function picks the compiled version
+when it is available and falls back to NumPy otherwise.
+"""
+import functools
+import importlib.util
+import numpy as np
+
+# Numba itself is only imported when a kernel first runs (importing it costs
+# ~0.2s, which short-lived jobs that never reach a kernel should not pay)
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+
+
+def _njit(func):
+    """Compile with Numba (nopython, on-disk cache) on first call, or return None without it."""
+    if not NUMBA_AVAILABLE:
+        return None
+    compiled = None
+
+    @functools.wraps(func)
+    def dispatch(*args):
+        nonlocal compiled
+        if compiled is None:
+            import numba
+            compiled = numba.njit(cache=True, nogil=True)(func)
+        return compiled(*args)
+    return dispatch
+
+
+# --- Formula 7 conditional rolling statistics ---------------------------------
+
+def _f7_rolling_stats_numpy(returns, lookback):
+    returns = np.asarray(returns, dtype=np.float64)
+    n = len(returns)
+    out = np.full((4, n), np.nan)
+    if n < lookback or lookback < 1:
+        return out
+    pos = np.where(returns > 0, returns, 0.0)
+    neg = np.where(returns < 0, returns, 0.0)
+    pos_cnt = np.concatenate(([0.0], np.cumsum(pos > 0)))
+    neg_cnt = np.concatenate(([0.0], np.cumsum(neg < 0)))
+    pos_sum = np.concatenate(([0.0], np.cumsum(pos)))
+    neg_sum = np.concatenate(([0.0], np.cumsum(neg)))
+    n_pos = pos_cnt[lookback:] - pos_cnt[:-lookback]
+    n_neg = neg_cnt[lookback:] - neg_cnt[:-lookback]
+    s_pos = pos_sum[lookback:] - pos_sum[:-lookback]
+    s_neg = neg_sum[lookback:] - neg_sum[:-lookback]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[0, lookback - 1:] = n_pos / lookback
+        out[1, lookback - 1:] = n_neg / lookback
+        out[2, lookback - 1:] = np.where(n_pos > 0, s_pos / np.maximum(n_pos, 1), 0.0)
+        out[3, lookback - 1:] = np.where(n_neg > 0, s_neg / np.maximum(n_neg, 1), 0.0)
+    return out
+
+
+def _f7_rolling_stats_py(returns, lookback):
+    n = returns.shape[0]
+    out = np.full((4, n), np.nan)
+    if n < lookback or lookback < 1:
+        return out
+    n_pos = 0
+    n_neg = 0
+    s_pos = 0.0
+    s_neg = 0.0
+    for i in range(n):
+        x = returns[i]
+        if x > 0:
+            n_pos += 1
+            s_pos += x
+        elif x < 0:
+            n_neg += 1
+            s_neg += x
+        if i >= lookback:
+            y = returns[i - lookback]
+            if y > 0:
+                n_pos -= 1
+                s_pos -= y
+            elif y < 0:
+                n_neg -= 1
+                s_neg -= y
+        if i >= lookback - 1:
+            out[0, i] = n_pos / lookback
+            out[1, i] = n_neg / lookback
+            out[2, i] = s_pos / n_pos if n_pos > 0 else 0.0
+            out[3, i] = s_neg / n_neg if n_neg > 0 else 0.0
+    return out
+
+
+_f7_rolling_stats_numba = _njit(_f7_rolling_stats_py)
+
+
+def f7_rolling_stats(returns, lookback=20):
+    """
+    Rolling (prob_high, prob_low, ret_high, ret_low) for Formula 7.
+
+    Returns a (4, n) float64 array; the first ``lookback - 1`` columns are NaN,
+    matching ``Series.rolling(lookback).apply``. NaN returns count as flat bars.
+    """
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    if _f7_rolling_stats_numba is not None:
+        return _f7_rolling_stats_numba(returns, lookback)
+    return _f7_rolling_stats_numpy(returns, lookback)
+
+
+# --- Stateful position logic --------------------------------------------------
+
+def _positions_from_signals_numpy(signals):
+    signals = np.asarray(signals, dtype=np.float64)
+    signals = np.where(np.isnan(signals), 0.0, signals)
+    idx = np.where(signals != 0, np.arange(len(signals)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    return np.where(idx >= 0, signals[np.maximum(idx, 0)], 0.0).astype(np.int8)
+
+
+def _positions_from_signals_py(signals):
+    n = signals.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    pos = 0
+    for i in range(n):
+        s = signals[i]
+        if s > 0:
+            pos = 1
+        elif s < 0:
+            pos = -1
+        out[i] = pos
+    return out
+
+
+_positions_from_signals_numba = _njit(_positions_from_signals_py)
+
+
+def positions_from_signals(signals):
+    """Hold the last non-zero signal (1 long, -1 short) until an opposite one arrives."""
+    signals = np.ascontiguousarray(signals, dtype=np.float64)
+    if _positions_from_signals_numba is not None:
+        return _positions_from_signals_numba(signals)
+    return _positions_from_signals_numpy(signals)
+
+
+# --- HMM forward recursion ----------------------------------------------------
+
+def _hmm_forward_numpy(log_startprob, log_transmat, log_frameprob):
+    # Scaled forward pass in probability space: one matvec per step instead of
+    # a logsumexp over an (n_states, n_states) matrix.
+    n, k = log_frameprob.shape
+    log_alpha = np.empty((n, k))
+    if n == 0:
+        return log_alpha, 0.0
+    frame_max = log_frameprob.max(axis=1)
+    frame = np.exp(log_frameprob - frame_max[:, None])
+    transmat = np.exp(log_transmat)
+    alpha = np.exp(log_startprob) * frame[0]
+    loglik = 0.0
+    with np.errstate(divide='ignore'):
+        for t in range(n):
+            if t:
+                alpha = (alpha @ transmat) * frame[t]
+            scale = alpha.sum()
+            if scale == 0:
+                log_alpha[t:] = -np.inf
+                return log_alpha, -np.inf
+            alpha = alpha / scale
+            loglik += np.log(scale) + frame_max[t]
+            log_alpha[t] = np.log(alpha) + loglik
+    return log_alpha, loglik
+
+
+def _hmm_forward_py(log_startprob, log_transmat, log_frameprob):
+    n, k = log_frameprob.shape
+    log_alpha = np.empty((n, k))
+    if n == 0:
+        return log_alpha, 0.0
+    for j in range(k):
+        log_alpha[0, j] = log_startprob[j] + log_frameprob[0, j]
+    work = np.empty(k)
+    for t in range(1, n):
+        for j in range(k):
+            m = -np.inf
+            for i in range(k):
+                work[i] = log_alpha[t - 1, i] + log_transmat[i, j]
+                if work[i] > m:
+                    m = work[i]
+            if m == -np.inf:
+                log_alpha[t, j] = -np.inf
+                continue
+            acc = 0.0
+            for i in range(k):
+                acc += np.exp(work[i] - m)
+            log_alpha[t, j] = m + np.log(acc) + log_frameprob[t, j]
+    m = -np.inf
+    for j in range(k):
+        if log_alpha[n - 1, j] > m:
+            m = log_alpha[n - 1, j]
+    if m == -np.inf:
+        return log_alpha, m
+    acc = 0.0
+    for j in range(k):
+        acc += np.exp(log_alpha[n - 1, j] - m)
+    return log_alpha, m + np.log(acc)
+
+
+_hmm_forward_numba = _njit(_hmm_forward_py)
+
+
+def hmm_forward(log_startprob, log_transmat, log_frameprob):
+    """
+    Log-space forward pass of an HMM.
+
+    ``log_frameprob`` is (n_samples, n_states), e.g. from
+    ``GaussianHMM._compute_log_likelihood``. Returns (log_alpha, log_likelihood).
+    """
+    log_startprob = np.ascontiguousarray(log_startprob, dtype=np.float64)
+    log_transmat = np.ascontiguousarray(log_transmat, dtype=np.float64)
+    log_frameprob = np.ascontiguousarray(log_frameprob, dtype=np.float64)
+    if _hmm_forward_numba is not None:
+        return _hmm_forward_numba(log_startprob, log_transmat, log_frameprob)
+    return _hmm_forward_numpy(log_startprob, log_transmat, log_frameprob)
+
+
+# --- Path-dependent stop / target exits ---------------------------------------
+
+def _stop_target_py(signals, high, low, close, stop_pct, target_pct):
+    n = close.shape[0]
+    positions = np.zeros(n, dtype=np.int8)
+    trade_returns = np.zeros(n)
+    pos = 0
+    entry = 0.0
+    stop = 0.0
+    target = 0.0
+    for i in range(n):
+        s = signals[i]
+        if pos == 1:
+            if low[i] <= stop:
+                trade_returns[i] = stop / entry - 1.0
+                pos = 0
+            elif high[i] >= target:
+                trade_returns[i] = target / entry - 1.0
+                pos = 0
+            elif s < 0:
+                trade_returns[i] = close[i] / entry - 1.0
+                pos = 0
+        elif pos == -1:
+            if high[i] >= stop:
+                trade_returns[i] = 1.0 - stop / entry
+                pos = 0
+            elif low[i] <= target:
+                trade_returns[i] = 1.0 - target / entry
+                pos = 0
+            elif s > 0:
+                trade_returns[i] = 1.0 - close[i] / entry
+                pos = 0
+        if pos == 0 and s != 0:
+            pos = 1 if s > 0 else -1
+            entry = close[i]
+            stop = entry * (1.0 - pos * stop_pct)
+            target = entry * (1.0 + pos * target_pct)
+        positions[i] = pos
+    return positions, trade_returns
+
+
+_stop_target_numba = _njit(_stop_target_py)
+
+
+# Every exit depends on the entry price chosen earlier, so bars cannot be
+# vectorized. Scanning ahead per trade with array ops loses to the plain loop
+# once signals are dense (F7 fires on most bars), so the fallback runs the
+# loop interpreted on the NumPy arrays.
+_stop_target_numpy = _stop_target_py
+
+
+def apply_stop_target(signals, high, low, close, stop_pct=0.01, target_pct=0.02):
+    """
+    Simulate entries on non-zero signals with a fixed stop and take-profit.
+
+    Entries fill at the bar close; on later bars the stop is checked before the
+    target (conservative when both are touched), and an opposite signal closes
+    the trade at the close. A signal on an exit bar opens a new trade at that
+    close. Returns (positions, trade_returns) where ``trade_returns`` holds the
+    realized return on each exit bar.
+    """
+    signals = np.nan_to_num(np.ascontiguousarray(signals, dtype=np.float64))
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    if _stop_target_numba is not None:
+        return _stop_target_numba(signals, high, low, close, float(stop_pct), float(target_pct))
+    return _stop_target_numpy(signals, high, low, close, float(stop_pct), float(target_pct))
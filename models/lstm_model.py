@@ -4,16 +4,21 @@ from sklearn.preprocessing import MinMaxScaler
 from keras.models import Sequential
 from keras.layers import LSTM, Dense
 from keras.callbacks import EarlyStopping
+from models.lstm_runtime import FEATURE_COLS, WEIGHTS_DIR, lstm_signal, save_runtime, weights_path
 from utils.logger import setup_logger
-import sqlite3
+from utils.schema import read_market, write_market
 import tensorflow as tf
 import os
 
-# Disable TensorFlow threading to avoid mutex issues
-os.environ['TF_NUM_INTEROP_THREADS'] = '1'
-os.environ['TF_NUM_INTRAOP_THREADS'] = '1'
-tf.config.threading.set_intra_op_parallelism_threads(1)
-tf.config.threading.set_inter_op_parallelism_threads(1)
+# Single-threaded TensorFlow by default to avoid mutex issues; the training
+# orchestrator (models.lstm_trainer) sets these variables to give each worker
+# process its share of the cores
+INTRA_OP_THREADS = int(os.environ.get('TF_NUM_INTRAOP_THREADS', '1'))
+INTER_OP_THREADS = int(os.environ.get('TF_NUM_INTEROP_THREADS', '1'))
+os.environ['TF_NUM_INTEROP_THREADS'] = str(INTER_OP_THREADS)
+os.environ['TF_NUM_INTRAOP_THREADS'] = str(INTRA_OP_THREADS)
+tf.config.threading.set_intra_op_parallelism_threads(INTRA_OP_THREADS)
+tf.config.threading.set_inter_op_parallelism_threads(INTER_OP_THREADS)
 
 logger = setup_logger('lstm_model', 'lstm_model.log')
 
@@ -25,9 +30,8 @@ def prepare_lstm_data(df, lookback=60):
     logger.info(f"Preparing LSTM data for {len(df)} rows with lookback={lookback}")
 
     # --- MODIFIED: ADD NEW FEATURES ---
-    # The new features will be added here
-    feature_cols = ['open', 'high', 'low', 'close', 'base_token_volume', 'log_returns', 'volatility', 'f7_value',
-                    'hmm_signal', 'bb_signal']
+    # The new features are listed in models.lstm_runtime.FEATURE_COLS
+    feature_cols = FEATURE_COLS
     # ---------------------------------
 
     # Check if all features are in the DataFrame
@@ -67,26 +71,32 @@ def train_lstm(X, y, epochs=50, batch_size=32):
 def predict_lstm(model, X, scaler, df, lookback=60):
     """Predict future prices and generate signals."""
     logger.info(f"Predicting with LSTM for {len(X)} sequences")
-    if X.shape[0] < lookback:
-        logger.error("Insufficient sequences for prediction")
+    if len(df) < lookback:
+        logger.error("Insufficient rows for prediction")
         return df, None
-    X_scaled = X[-lookback:].reshape(1, lookback, X.shape[2])
+    # The window ends at the latest candle, so the model predicts the next close
+    X_scaled = scaler.transform(df[FEATURE_COLS].iloc[-lookback:]).reshape(1, lookback, len(FEATURE_COLS))
     predicted = model.predict(X_scaled, verbose=0)
-    predicted_price = scaler.inverse_transform(np.concatenate([np.zeros((1, X.shape[2]-1)), predicted], axis=1))[:, -1][0]
+    close_idx = FEATURE_COLS.index('close')
+    predicted_price = (predicted[0, 0] - scaler.min_[close_idx]) / scaler.scale_[close_idx]
     current_close = df['close'].iloc[-1]
-    lstm_signal = 0
-    lstm_signal = 1 if predicted_price > current_close * 1.001 else -1 if predicted_price < current_close * 0.999 else 0
-    df.loc[df.index[-1], 'lstm_signal'] = lstm_signal
-    logger.info(f"LSTM prediction for {df['started_at'].iloc[-1]}: {predicted_price:.2f}, Signal: {lstm_signal}")
-    print(f"LSTM prediction for {df['started_at'].iloc[-1]}: {predicted_price:.2f}, Signal: {lstm_signal}")
+    lstm_signal_value = lstm_signal(predicted_price, current_close)
+    df.loc[df.index[-1], 'lstm_signal'] = lstm_signal_value
+    logger.info(f"LSTM prediction for {df['started_at'].iloc[-1]}: {predicted_price:.2f}, Signal: {lstm_signal_value}")
+    print(f"LSTM prediction for {df['started_at'].iloc[-1]}: {predicted_price:.2f}, Signal: {lstm_signal_value}")
     return df, predicted_price
 
-def backtest_lstm(market='BTC-USD', db_name='crypto_data.db'):
+def export_lstm(model, scaler, market='BTC-USD', weights_dir=WEIGHTS_DIR, lookback=60):
+    """Export trained weights and scaler for the TensorFlow-free runtime (models.lstm_runtime)."""
+    path = weights_path(market, weights_dir)
+    layer_weights = [layer.get_weights() for layer in model.layers if layer.get_weights()]
+    save_runtime(path, layer_weights, scaler, lookback=lookback)
+    return path
+
+def backtest_lstm(market='BTC-USD', db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
     """Backtest LSTM on market data."""
     try:
-        conn = sqlite3.connect(db_name, isolation_level=None)
-        df = pd.read_sql(f"SELECT * FROM {market.replace('-', '_')}_data", conn)
-        conn.close()
+        df = read_market(market, db_name)
         if df.empty or 'started_at' not in df.columns:
             logger.error(f"No data or missing 'started_at' for {market} in {db_name}")
             return pd.DataFrame()
@@ -99,12 +109,11 @@ def backtest_lstm(market='BTC-USD', db_name='crypto_data.db'):
             logger.error(f"Insufficient sequences for LSTM training for {market}")
             return df
         model = train_lstm(X, y)
+        export_lstm(model, scaler, market, weights_dir)
         df, predicted_price = predict_lstm(model, X, scaler, df)
         logger.info(f"Backtested LSTM for {market}: Predicted price {predicted_price:.2f}")
         print(f"Backtested LSTM for {market}: Predicted price {predicted_price:.2f}")
-        conn = sqlite3.connect(db_name, isolation_level=None)
-        df.to_sql(f"{market.replace('-', '_')}_data", conn, if_exists='replace', index=False)
-        conn.close()
+        write_market(df, market, db_name)
         logger.info(f"Saved {len(df)} rows with LSTM signals for {market} to {db_name}")
         return df
     except Exception as e:
@@ -0,0 +1,205 @@
+# models/lstm_runtime.py
+"""
+TensorFlow-free inference for the trained LSTM models.
+
+``models.lstm_model.export_lstm`` writes the two LSTM layers, the two Dense
+layers and the fitted ``MinMaxScaler`` parameters of a trained model to a
+compressed ``.npz`` file. This module loads that file and runs the forward
+pass in NumPy, so live inference never imports TensorFlow or Keras. Models
+with the same architecture are stacked along a leading axis so all markets
+are predicted in a single batched call.
+"""
+import logging
+import os
+import sqlite3
+import numpy as np
+from config import TRADING_MARKETS
+from utils.schema import read_market
+
+# Imported by the strategy and walk-forward modules, so it logs through their configuration
+logger = logging.getLogger(__name__)
+
+FEATURE_COLS = ['open', 'high', 'low', 'close', 'base_token_volume', 'log_returns', 'volatility', 'f7_value',
+                'hmm_signal', 'bb_signal']
+TARGET_COL = 'close'
+WEIGHTS_DIR = 'lstm_weights'
+LAYER_KEYS = ['lstm0_kernel', 'lstm0_recurrent', 'lstm0_bias', 'lstm1_kernel', 'lstm1_recurrent', 'lstm1_bias',
+              'dense0_kernel', 'dense0_bias', 'dense1_kernel', 'dense1_bias']
+
+
+def weights_path(market, weights_dir=WEIGHTS_DIR):
+    """Location of the exported weights for ``market``."""
+    return os.path.join(weights_dir, f"{market.replace('-', '_')}_lstm.npz")
+
+
+def lstm_signal(predicted_price, current_close):
+    """Buy above +0.1%, sell below -0.1%, otherwise hold."""
+    return 1 if predicted_price > current_close * 1.001 else -1 if predicted_price < current_close * 0.999 else 0
+
+
+def save_runtime(path, layer_weights, scaler, lookback=60, feature_cols=FEATURE_COLS, target_col=TARGET_COL):
+    """
+    Write LSTM/Dense weights and scaler parameters to ``path``.
+
+    ``layer_weights`` is the list of ``get_weights()`` results for the
+    LSTM, LSTM, Dense, Dense layers in order.
+    """
+    arrays = [w for weights in layer_weights for w in weights]
+    if len(arrays) != len(LAYER_KEYS):
+        raise ValueError(f"Expected {len(LAYER_KEYS)} weight arrays, got {len(arrays)}")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    np.savez_compressed(
+        path,
+        **{key: np.asarray(w, dtype=np.float32) for key, w in zip(LAYER_KEYS, arrays)},
+        scaler_min=scaler.min_, scaler_scale=scaler.scale_,
+        lookback=np.int64(lookback), feature_cols=np.array(feature_cols),
+        target_index=np.int64(list(feature_cols).index(target_col)),
+    )
+    logger.info(f"Exported LSTM runtime weights to {path}")
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _lstm_layer(x, kernel, recurrent, bias, return_sequences):
+    """Keras LSTM (gates i, f, c, o; sigmoid/tanh) over x of shape (M, B, T, F)."""
+    m, b, t, _ = x.shape
+    units = recurrent.shape[-1] // 4
+    # Input projection for every timestep at once, then the recurrence
+    z_x = x @ kernel[:, None] + bias[:, None, None]
+    h = np.zeros((m, b, units), dtype=x.dtype)
+    c = np.zeros((m, b, units), dtype=x.dtype)
+    outputs = np.empty((m, b, t, units), dtype=x.dtype) if return_sequences else None
+    for step in range(t):
+        z = z_x[:, :, step] + h @ recurrent
+        i = _sigmoid(z[..., :units])
+        f = _sigmoid(z[..., units:2 * units])
+        g = np.tanh(z[..., 2 * units:3 * units])
+        o = _sigmoid(z[..., 3 * units:])
+        c = f * c + i * g
+        h = o * np.tanh(c)
+        if return_sequences:
+            outputs[:, :, step] = h
+    return outputs if return_sequences else h
+
+
+class LSTMRuntime:
+    """Stacked NumPy forward pass for one or more exported LSTM models."""
+
+    def __init__(self, params, markets):
+        self.params = params
+        self.markets = list(markets)
+        self.lookback = int(params['lookback'])
+        self.feature_cols = [str(col) for col in params['feature_cols']]
+        self.target_index = int(params['target_index'])
+
+    @classmethod
+    def load(cls, paths):
+        """Load {market: path} (or a single path) and stack the weights along the market axis."""
+        if isinstance(paths, (str, os.PathLike)):
+            paths = {'default': paths}
+        loaded = []
+        for path in paths.values():
+            with np.load(path) as data:
+                loaded.append({key: data[key] for key in data.files})
+        first = loaded[0]
+        for params in loaded[1:]:
+            if any(params[key].shape != first[key].shape for key in LAYER_KEYS + ['scaler_min']) \
+                    or int(params['lookback']) != int(first['lookback']):
+                raise ValueError("Cannot batch LSTM models with different architectures")
+        params = {key: np.stack([p[key] for p in loaded]) for key in LAYER_KEYS + ['scaler_min', 'scaler_scale']}
+        params.update({key: first[key] for key in ['lookback', 'feature_cols', 'target_index']})
+        return cls(params, paths.keys())
+
+    @classmethod
+    def load_markets(cls, markets, weights_dir=WEIGHTS_DIR):
+        """Load the exported model of every market in ``markets``."""
+        return cls.load({market: weights_path(market, weights_dir) for market in markets})
+
+    def forward(self, x, market_index=None):
+        """
+        Scaled predictions for x of shape (n_markets, batch, lookback, n_features).
+
+        With ``market_index`` only that market's model runs and x has shape (1, batch, lookback, n_features).
+        """
+        p = self.params
+        if market_index is not None:
+            p = {key: p[key][market_index:market_index + 1] for key in LAYER_KEYS}
+        x = np.asarray(x, dtype=np.float32)
+        h = _lstm_layer(x, p['lstm0_kernel'], p['lstm0_recurrent'], p['lstm0_bias'], return_sequences=True)
+        h = _lstm_layer(h, p['lstm1_kernel'], p['lstm1_recurrent'], p['lstm1_bias'], return_sequences=False)
+        h = h @ p['dense0_kernel'] + p['dense0_bias'][:, None]
+        h = h @ p['dense1_kernel'] + p['dense1_bias'][:, None]
+        return h[..., 0]
+
+    def scale(self, values, market_index=0):
+        """Apply the market's MinMaxScaler to raw feature values."""
+        return values * self.params['scaler_scale'][market_index] + self.params['scaler_min'][market_index]
+
+    def inverse_target(self, scaled, market_index=0):
+        """Map scaled predictions back to prices with the target column's scaler parameters."""
+        i = self.target_index
+        return (scaled - self.params['scaler_min'][market_index, i]) / self.params['scaler_scale'][market_index, i]
+
+    def predict_series(self, values, market_index=0, batch_size=4096):
+        """
+        Predicted next close for every window of raw feature rows ``values`` (n, n_features).
+
+        Element j is the prediction made at the close of row ``j + lookback - 1``.
+        Windows are strided views of one scaled array and run through the
+        forward pass ``batch_size`` at a time.
+        """
+        scaled = self.scale(np.asarray(values, dtype=np.float64), market_index).astype(np.float32)
+        if len(scaled) < self.lookback:
+            return np.empty(0)
+        windows = np.lib.stride_tricks.sliding_window_view(scaled, self.lookback, axis=0).transpose(0, 2, 1)
+        scaled_pred = np.concatenate([self.forward(windows[start:start + batch_size][None], market_index)[0]
+                                      for start in range(0, len(windows), batch_size)])
+        return self.inverse_target(scaled_pred.astype(np.float64), market_index)
+
+    def windows(self, dfs):
+        """Stack the last ``lookback`` scaled feature rows of each market's DataFrame."""
+        windows = []
+        for m, market in enumerate(self.markets):
+            df = dfs[market]
+            missing_cols = [col for col in self.feature_cols if col not in df.columns]
+            if missing_cols:
+                raise ValueError(f"Missing columns for LSTM in {market}: {missing_cols}")
+            if len(df) < self.lookback:
+                raise ValueError(f"Insufficient rows ({len(df)}) for LSTM prediction in {market}")
+            values = df[self.feature_cols].iloc[-self.lookback:].to_numpy(dtype=np.float64)
+            windows.append(self.scale(values, m)[None])
+        return np.stack(windows)
+
+    def predict(self, dfs):
+        """
+        Predict the next close and signal for every loaded market in one batched pass.
+
+        ``dfs`` maps market to its candle DataFrame (with the model's feature
+        columns). Returns {market: (predicted_price, lstm_signal)}.
+        """
+        if not isinstance(dfs, dict):
+            dfs = {self.markets[0]: dfs}
+        prices = self.inverse_target(self.forward(self.windows(dfs))[:, 0], slice(None))
+        results = {}
+        for market, price in zip(self.markets, prices):
+            price = float(price)
+            results[market] = (price, lstm_signal(price, dfs[market]['close'].iloc[-1]))
+            logger.info(f"LSTM runtime prediction for {market}: {price:.2f}, Signal: {results[market][1]}")
+        return results
+
+
+def predict_markets(markets=TRADING_MARKETS, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
+    """Load every market's exported model and latest candles and predict them in one batched call."""
+    markets = [market for market in markets if os.path.exists(weights_path(market, weights_dir))]
+    if not markets:
+        logger.error(f"No exported LSTM weights in {weights_dir}")
+        return {}
+    runtime = LSTMRuntime.load_markets(markets, weights_dir)
+    conn = sqlite3.connect(db_name)
+    try:
+        dfs = {market: read_market(market, conn=conn) for market in markets}
+    finally:
+        conn.close()
+    return runtime.predict(dfs)
@@ -0,0 +1,195 @@
+# models/lstm_trainer.py
+"""
+Concurrent LSTM training for every market in ``TRADING_MARKETS``.
+
+Each market trains in its own spawned process (TensorFlow is only imported
+there), so a crash or hang in one market cannot take down the others, and a
+market that exceeds ``timeout`` seconds is terminated. The cores are split
+between the concurrent workers and handed to TensorFlow through
+``TF_NUM_INTRAOP_THREADS`` (read by ``models.lstm_model`` at import), so the
+total thread count matches the machine instead of every worker running
+single-threaded. A manifest of candle fingerprints in the weights directory
+skips markets whose data has not changed since their last successful run.
+
+Usage: python -m models.lstm_trainer [--force] [--workers N] [--timeout SECONDS]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+from config import TRADING_MARKETS
+from models.lstm_runtime import WEIGHTS_DIR, weights_path
+from utils.feature_cache import fingerprint, row_hashes
+from utils.logger import setup_logger
+from utils.schema import read_market
+
+logger = setup_logger('lstm_trainer', 'lstm_trainer.log')
+
+MANIFEST = 'training_manifest.json'
+CANDLE_COLS = ['started_at', 'open', 'high', 'low', 'close', 'base_token_volume']
+THREAD_ENV_VARS = ['TF_NUM_INTRAOP_THREADS', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+
+
+def thread_budgets(n_workers, n_cores=None):
+    """Split ``n_cores`` between ``n_workers`` so the budgets sum to the core count (at least 1 each)."""
+    n_cores = n_cores or os.cpu_count() or 1
+    base, extra = divmod(n_cores, n_workers)
+    return [max(1, base + (1 if i < extra else 0)) for i in range(n_workers)]
+
+
+def data_fingerprint(market, db_name='crypto_data.db'):
+    """Fingerprint of the raw candles a market's model is trained on (None when unavailable)."""
+    try:
+        df = read_market(market, db_name)
+    except Exception as e:
+        logger.error(f"Cannot read candles for {market}: {e}")
+        return None
+    if df.empty:
+        return None
+    return fingerprint(row_hashes(df, [col for col in CANDLE_COLS if col in df.columns]))
+
+
+def load_manifest(weights_dir=WEIGHTS_DIR):
+    path = os.path.join(weights_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, weights_dir=WEIGHTS_DIR):
+    os.makedirs(weights_dir, exist_ok=True)
+    path = os.path.join(weights_dir, MANIFEST)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def train_market(market, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR):
+    """Worker body: refresh the supporting signals, then train and export the market's LSTM."""
+    from models.bollinger_bands import backtest_bollinger_bands
+    from models.formula_7 import backtest_formula_7
+    from models.hmm_regime import backtest_hmm
+    from models.lstm_model import backtest_lstm
+
+    backtest_bollinger_bands(market, db_name)
+    backtest_hmm(market, db_name)
+    backtest_formula_7(market, db_name)
+    path = weights_path(market, weights_dir)
+    previous = os.path.getmtime(path) if os.path.exists(path) else None
+    df = backtest_lstm(market, db_name, weights_dir=weights_dir)
+    # backtest_lstm logs and swallows its errors, so check that a fresh model was exported
+    if df.empty or not os.path.exists(path) or os.path.getmtime(path) == previous:
+        raise RuntimeError(f"LSTM training produced no model for {market}")
+    return len(df)
+
+
+def _worker(target, market, threads, db_name, weights_dir, results):
+    """Process entry point: apply the thread budget before anything imports TensorFlow."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    start = time.perf_counter()
+    try:
+        rows = target(market, db_name, weights_dir)
+        results.put({'market': market, 'status': 'trained', 'rows': rows,
+                     'seconds': time.perf_counter() - start})
+    except Exception as e:
+        results.put({'market': market, 'status': 'failed', 'error': repr(e),
+                     'seconds': time.perf_counter() - start})
+
+
+def train_all(markets=TRADING_MARKETS, db_name='crypto_data.db', weights_dir=WEIGHTS_DIR, workers=None,
+              timeout=1800, force=False, target=train_market, progress=None):
+    """
+    Train every market whose candles changed since its last successful run, concurrently.
+
+    Returns {market: result} where result['status'] is 'trained', 'skipped',
+    'failed' or 'timeout'. ``progress`` is called with (done, total, result)
+    after each market finishes.
+    """
+    manifest = load_manifest(weights_dir)
+    results, pending = {}, []
+    for market in markets:
+        fp = data_fingerprint(market, db_name)
+        if fp is None:
+            results[market] = {'market': market, 'status': 'failed', 'error': 'no candle data'}
+        elif not force and manifest.get(market) == fp and os.path.exists(weights_path(market, weights_dir)):
+            results[market] = {'market': market, 'status': 'skipped'}
+        else:
+            pending.append((market, fp))
+    total = len(markets)
+    for result in results.values():
+        logger.info(f"{result['market']}: {result['status']}")
+        if progress:
+            progress(len(results), total, result)
+    if not pending:
+        return results
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    budgets = thread_budgets(workers)
+    ctx = mp.get_context('spawn')
+    queue_ = ctx.Queue()
+    running = {}  # market -> (process, fingerprint, started, budget slot)
+    free_slots = list(range(workers))
+    start_all = time.perf_counter()
+
+    def finish(market, result):
+        process, fp, _, slot = running.pop(market)
+        process.join(timeout=5)
+        free_slots.append(slot)
+        results[market] = result
+        if result['status'] == 'trained':
+            manifest[market] = fp
+            save_manifest(manifest, weights_dir)
+        logger.info(f"[{len(results)}/{total}] {market}: {result['status']} in {result.get('seconds', 0):.1f}s"
+                    + (f" ({result['error']})" if 'error' in result else ''))
+        if progress:
+            progress(len(results), total, result)
+
+    while pending or running:
+        while pending and free_slots:
+            market, fp = pending.pop(0)
+            slot = free_slots.pop(0)
+            process = ctx.Process(target=_worker, args=(target, market, budgets[slot], db_name, weights_dir, queue_),
+                                  name=f"lstm-{market}", daemon=True)
+            process.start()
+            running[market] = (process, fp, time.perf_counter(), slot)
+            logger.info(f"Training {market} with {budgets[slot]} threads")
+        try:
+            result = queue_.get(timeout=0.5)
+            if result['market'] in running:
+                finish(result['market'], result)
+        except queue.Empty:
+            pass
+        now = time.perf_counter()
+        for market, (process, _, started, _) in list(running.items()):
+            if now - started > timeout:
+                process.terminate()
+                finish(market, {'market': market, 'status': 'timeout', 'seconds': now - started})
+            elif not process.is_alive() and process.exitcode not in (None, 0):
+                finish(market, {'market': market, 'status': 'failed', 'seconds': now - started,
+                                'error': f"worker exited with code {process.exitcode}"})
+    logger.info(f"Trained {sum(r['status'] == 'trained' for r in results.values())}/{total} markets "
+                f"in {time.perf_counter() - start_all:.1f}s")
+    return results
+
+
+def _print_progress(done, total, result):
+    detail = f" in {result['seconds']:.1f}s" if 'seconds' in result else ''
+    error = f": {result['error']}" if 'error' in result else ''
+    print(f"[{done}/{total}] {result['market']} {result['status']}{detail}{error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the LSTM for every market concurrently.")
+    parser.add_argument('--markets', nargs='+', default=TRADING_MARKETS)
+    parser.add_argument('--db', default='crypto_data.db')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--timeout', type=float, default=1800)
+    parser.add_argument('--force', action='store_true', help="Retrain even if the candles did not change")
+    args = parser.parse_args()
+    train_all(args.markets, args.db, workers=args.workers, timeout=args.timeout, force=args.force,
+              progress=_print_progress)
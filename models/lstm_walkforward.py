@@ -0,0 +1,177 @@
+# models/lstm_walkforward.py
+"""
+Walk-forward (rolling-origin) LSTM signals for the full candle history.
+
+History is cut into segments of ``retrain_every`` candles starting after
+``initial_train`` rows. For each segment a model is trained only on the
+candles before its origin (the last ``train_window`` of them, or all of them
+when ``train_window`` is None), with the scaler fitted on that same slice, and
+then predicts every candle of the segment. The stored ``hmm_signal`` comes
+from an HMM fitted and Viterbi-decoded over the whole history, so it is not
+used: each segment fits its own regime HMM on the training slice and labels
+candles with the filtered forward pass, where a row's label only depends on
+the rows before it. Each ``lstm_signal`` is therefore out of sample.
+Predictions run through ``LSTMRuntime.predict_series`` in large batches over
+strided windows instead of one Keras ``predict`` per bar.
+
+Segment models and their HMM parameters are exported to
+``<weights_dir>/walkforward`` and predictions are appended to the
+``<MARKET>_lstm_wf`` table, so a rerun only scores
+candles added since the last run: the open segment keeps its model and new
+segments are trained as their origins are reached. The signals are also
+written to the market table's ``lstm_signal`` column for the backtests and
+dashboard.
+
+Usage: python -m models.lstm_walkforward --markets BTC-USD --retrain-every 2016
+"""
+import argparse
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from config import TRADING_MARKETS
+from models.lstm_runtime import FEATURE_COLS, WEIGHTS_DIR, LSTMRuntime, save_runtime
+from utils.logger import setup_logger
+from utils.schema import read_market, write_market
+
+logger = setup_logger('lstm_walkforward', 'lstm_walkforward.log')
+
+HMM_COL = FEATURE_COLS.index('hmm_signal')
+PREDICTION_DTYPES = {'started_at': 'int64', 'origin': 'int64', 'predicted_close': 'float64', 'lstm_signal': 'int8'}
+
+
+def predictions_table(market):
+    return f"{market.replace('-', '_')}_lstm_wf"
+
+
+def segment_path(market, origin, weights_dir=WEIGHTS_DIR):
+    """Exported model of the segment whose first candle is ``origin`` (epoch ms)."""
+    return os.path.join(weights_dir, 'walkforward', f"{market.replace('-', '_')}_{origin}.npz")
+
+
+def hmm_path(path):
+    """Regime HMM parameters stored next to the segment model at ``path``."""
+    return path[:-len('.npz')] + '_hmm.npz'
+
+
+def fit_segment(train_df, path, lookback=60, epochs=50):
+    """Train an LSTM on ``train_df`` and export it to ``path`` (TensorFlow is only imported here)."""
+    from models.lstm_model import prepare_lstm_data, train_lstm
+    X, y, scaler = prepare_lstm_data(train_df, lookback=lookback)
+    if len(X) == 0:
+        raise ValueError(f"Insufficient rows ({len(train_df)}) to train a walk-forward segment")
+    model = train_lstm(X, y, epochs=epochs)
+    save_runtime(path, [layer.get_weights() for layer in model.layers if layer.get_weights()], scaler,
+                 lookback=lookback)
+
+
+def segments(n_rows, initial_train=2016, retrain_every=2016):
+    """(start, stop) row ranges of the walk-forward segments."""
+    return [(start, min(start + retrain_every, n_rows)) for start in range(initial_train, n_rows, retrain_every)]
+
+
+def load_predictions(market, conn):
+    """Stored walk-forward predictions for ``market`` (empty frame when none)."""
+    try:
+        df = pd.read_sql(f"SELECT * FROM {predictions_table(market)} ORDER BY started_at", conn)
+    except Exception:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in PREDICTION_DTYPES.items()})
+    return df.astype(PREDICTION_DTYPES)
+
+
+def walk_forward(market='BTC-USD', db_name='crypto_data.db', weights_dir=WEIGHTS_DIR, lookback=60,
+                 initial_train=2016, retrain_every=2016, train_window=8064, epochs=50, batch_size=4096,
+                 fit=fit_segment):
+    """
+    Score every candle after ``initial_train`` with out-of-sample LSTM predictions.
+
+    Only candles newer than the stored predictions are processed. Returns the
+    market DataFrame with ``lstm_signal`` filled for every scored candle.
+    ``fit(train_df, path, lookback, epochs)`` trains and exports one segment
+    model; ``train_df`` carries the segment's causal ``hmm_signal``.
+    """
+    if initial_train <= lookback:
+        raise ValueError(f"initial_train ({initial_train}) must exceed lookback ({lookback})")
+    # Imported here: hmm_regime sets up its own log file, which would take over this module's
+    from models.hmm_regime import filtered_hmm_signal, fit_regime_params
+    conn = sqlite3.connect(db_name)
+    try:
+        df = read_market(market, conn=conn)
+        if df.empty or 'started_at' not in df.columns:
+            logger.error(f"No data or missing 'started_at' for {market} in {db_name}")
+            return pd.DataFrame()
+        missing_cols = [col for col in FEATURE_COLS if col != 'hmm_signal' and col not in df.columns]
+        if missing_cols:
+            logger.error(f"Missing columns for LSTM in {market}: {missing_cols}; run the BB/HMM/F7 backtests first")
+            return pd.DataFrame()
+        df = df.sort_values('started_at').reset_index(drop=True)
+        stored = load_predictions(market, conn)
+        done = stored['started_at'].max() if len(stored) else None
+        started_at = df['started_at'].to_numpy()
+        features = df.reindex(columns=FEATURE_COLS).to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy()
+
+        # Rows up to the last stored prediction are already scored
+        first_new = 0 if done is None else int(np.searchsorted(started_at, done, side='right'))
+        new = []
+        for seg_start, stop in segments(len(df), initial_train, retrain_every):
+            start = max(seg_start, first_new)
+            if start >= stop:
+                continue
+            origin = int(started_at[seg_start])
+            path = segment_path(market, origin, weights_dir)
+            t0 = time.perf_counter()
+            train_from = 0 if train_window is None else max(0, seg_start - train_window)
+            trained = os.path.exists(path) and os.path.exists(hmm_path(path))
+            if trained:
+                with np.load(hmm_path(path)) as data:
+                    hmm_params = {key: data[key] for key in data.files}
+            else:
+                hmm_params = fit_regime_params(df.iloc[train_from:seg_start])
+            # The filter always starts at the same row, so reruns of the open segment label rows identically
+            lo = min(train_from, seg_start - lookback + 1)
+            seg_features = features[lo:stop].copy()
+            seg_features[:, HMM_COL] = filtered_hmm_signal(hmm_params, df.iloc[lo:stop])
+            if not trained:
+                train_df = df.iloc[train_from:seg_start].copy()
+                train_df['hmm_signal'] = seg_features[train_from - lo:seg_start - lo, HMM_COL].astype(np.int8)
+                fit(train_df, path, lookback, epochs)
+                np.savez(hmm_path(path), **hmm_params)
+            runtime = LSTMRuntime.load(path)
+            predicted = runtime.predict_series(seg_features[start - lookback + 1 - lo:stop - lo], batch_size=batch_size)
+            # Vectorised models.lstm_runtime.lstm_signal
+            signals = np.where(predicted > close[start:stop] * 1.001, 1,
+                               np.where(predicted < close[start:stop] * 0.999, -1, 0)).astype(np.int8)
+            new.append(pd.DataFrame({'started_at': started_at[start:stop], 'origin': origin,
+                                     'predicted_close': predicted, 'lstm_signal': signals}))
+            logger.info(f"{market}: scored {stop - start} candles of segment {origin} in {time.perf_counter() - t0:.2f}s")
+
+        if new:
+            new = pd.concat(new, ignore_index=True).astype(PREDICTION_DTYPES)
+            new.to_sql(predictions_table(market), conn, if_exists='append', index=False,
+                       dtype={'started_at': 'INTEGER', 'origin': 'INTEGER', 'predicted_close': 'REAL',
+                              'lstm_signal': 'INTEGER'})
+            stored = pd.concat([stored, new], ignore_index=True) if len(stored) else new
+        signal = pd.Series(stored['lstm_signal'].to_numpy(), index=stored['started_at'].to_numpy())
+        df['lstm_signal'] = df['started_at'].map(signal).astype('Int8')
+        write_market(df, market, conn=conn)
+        logger.info(f"Walk-forward LSTM for {market}: {len(new)} new, {len(stored)} total predictions")
+        print(f"Walk-forward LSTM for {market}: {len(new)} new, {len(stored)} total predictions")
+        return df
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward LSTM signals for the full history.")
+    parser.add_argument('--markets', nargs='+', default=TRADING_MARKETS)
+    parser.add_argument('--db', default='crypto_data.db')
+    parser.add_argument('--initial-train', type=int, default=2016, help="Candles before the first origin")
+    parser.add_argument('--retrain-every', type=int, default=2016, help="Candles per segment")
+    parser.add_argument('--train-window', type=int, default=8064, help="Training candles per segment (0 = expanding)")
+    parser.add_argument('--epochs', type=int, default=50)
+    args = parser.parse_args()
+    for market in args.markets:
+        walk_forward(market, args.db, initial_train=args.initial_train, retrain_every=args.retrain_every,
+                     train_window=args.train_window or None, epochs=args.epochs)
@@ -1,5 +1,7 @@
 import pytest
 import pandas as pd
+import numpy as np
+import sqlite3
 from models.bollinger_bands import calculate_bollinger_bands, backtest_bollinger_bands
 
 
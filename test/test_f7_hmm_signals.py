@@ -0,0 +1,40 @@
+import sys
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+import execution
+from models import f7_hmm_signals
+from models.lstm_runtime import FEATURE_COLS, save_runtime, weights_path
+from utils.schema import write_market
+from test.test_lstm_runtime import random_weights
+
+
+def test_execute_trades_uses_runtime_without_tensorflow(tmp_path, monkeypatch):
+    db_name = str(tmp_path / 'crypto.db')
+    weights_dir = str(tmp_path / 'weights')
+    n = 200
+    i = np.arange(n)
+    close = 100 + np.sin(i / 10) * 10
+    df = pd.DataFrame({
+        'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min', tz='UTC').astype(str),
+        'open': close - 1, 'high': close + 2, 'low': close - 2, 'close': close, 'base_token_volume': 1000.0 + i,
+    })
+    df['log_returns'] = np.log(df['close'] / df['close'].shift(1)).fillna(0)
+    df['volatility'] = df['log_returns'].rolling(window=20).std().fillna(0)
+    write_market(df, 'BTC-USD', db_name)
+    features = df.assign(f7_value=0.0, hmm_signal=np.where(i % 2, 1, -1), bb_signal=i % 3 - 1)
+    weights = random_weights(np.random.default_rng(0), units=8, dense_units=4)
+    save_runtime(weights_path('BTC-USD', weights_dir), weights, MinMaxScaler().fit(features[FEATURE_COLS]), lookback=20)
+
+    # Importing TensorFlow or starting the training subprocess fails the trade path
+    monkeypatch.setitem(sys.modules, 'tensorflow', None)
+    monkeypatch.setitem(sys.modules, 'keras', None)
+    monkeypatch.setattr(f7_hmm_signals.mp, 'Process', None)
+    orders = []
+    monkeypatch.setattr(execution, 'execute_signal', lambda *args, **kwargs: orders.append(args))
+
+    f7_hmm_signals.execute_trades('BTC-USD', db_name, weights_dir)
+    assert len(orders) == 1, "A trade decision should be made from the exported weights"
+    market, signal, price = orders[0]
+    assert market == 'BTC-USD' and signal in (-1, 0, 1) and price == pytest.approx(close[-1])
@@ -0,0 +1,85 @@
+import pytest
+import pandas as pd
+import numpy as np
+from models.bollinger_bands import calculate_bollinger_bands, BB_COLUMNS
+from models.formula_7 import calculate_formula_7, F7_COLUMNS
+from utils.feature_cache import FeatureCache
+
+
+def _sample_df(n=200):
+    data = {
+        'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min'),
+        'close': [100 + np.sin(i / 10) * 10 + 0.01 * i for i in range(n)],
+    }
+    return pd.DataFrame(data)
+
+
+def test_cache_hit_and_disk_tier(tmp_path):
+    cache = FeatureCache(cache_dir=str(tmp_path))
+    df = _sample_df()
+    first = cache.apply(df.copy(), 'BTC-USD', 'bollinger_bands', calculate_bollinger_bands,
+                        params={'window': 20, 'num_std': 2}, output_cols=BB_COLUMNS, warmup=20)
+    second = cache.apply(df.copy(), 'BTC-USD', 'bollinger_bands', calculate_bollinger_bands,
+                         params={'window': 20, 'num_std': 2}, output_cols=BB_COLUMNS, warmup=20)
+    assert cache.stats['misses'] == 1 and cache.stats['hits'] == 1, "Second call should hit memory"
+    pd.testing.assert_frame_equal(first, second)
+
+    fresh = FeatureCache(cache_dir=str(tmp_path))
+    third = fresh.apply(df.copy(), 'BTC-USD', 'bollinger_bands', calculate_bollinger_bands,
+                        params={'window': 20, 'num_std': 2}, output_cols=BB_COLUMNS, warmup=20)
+    assert fresh.stats['hits'] == 1, "New process should hit the disk tier"
+    pd.testing.assert_frame_equal(first, third)
+
+    fresh.apply(df.copy(), 'BTC-USD', 'bollinger_bands', calculate_bollinger_bands,
+                params={'window': 10, 'num_std': 2}, output_cols=BB_COLUMNS, warmup=10)
+    assert fresh.stats['misses'] == 1, "Different parameters should miss"
+
+
+def test_cache_extends_appended_candles(tmp_path):
+    cache = FeatureCache(cache_dir=str(tmp_path))
+    df = _sample_df()
+    cache.apply(df.iloc[:150].copy(), 'BTC-USD', 'formula_7', calculate_formula_7, params={'lookback': 20},
+                output_cols=F7_COLUMNS, warmup=21)
+    extended = cache.apply(df.copy(), 'BTC-USD', 'formula_7', calculate_formula_7, params={'lookback': 20},
+                           output_cols=F7_COLUMNS, warmup=21)
+    assert cache.stats['extensions'] == 1, "Appended candles should extend the cached entry"
+    expected = calculate_formula_7(df.copy())
+    for col in F7_COLUMNS:
+        assert np.allclose(extended[col], expected[col], equal_nan=True), f"{col} differs after extension"
+
+    changed = df.copy()
+    changed.loc[10, 'close'] += 1
+    cache.apply(changed, 'BTC-USD', 'formula_7', calculate_formula_7, params={'lookback': 20},
+                output_cols=F7_COLUMNS, warmup=21)
+    assert cache.stats['misses'] == 2, "Edited history should invalidate the entry"
+
+
+def test_cache_lru_eviction():
+    cache = FeatureCache(max_bytes=1, cache_dir=None)
+    for market in ['BTC-USD', 'ETH-USD']:
+        cache.apply(_sample_df(), market, 'bollinger_bands', calculate_bollinger_bands,
+                    output_cols=BB_COLUMNS, warmup=20)
+    assert cache.stats['evictions'] == 1, "Oldest entry should be evicted over the byte cap"
+
+
+def test_changed_compute_misses_cache(tmp_path):
+    def compute(df):
+        df['doubled'] = df['close'] * 2
+        return df
+
+    def edited(df):
+        df['doubled'] = df['close'] * 2 + 1
+        return df
+
+    df = _sample_df()
+    FeatureCache(cache_dir=str(tmp_path)).apply(df.copy(), 'BTC-USD', 'doubled', compute, output_cols=['doubled'])
+
+    fresh = FeatureCache(cache_dir=str(tmp_path))
+    result = fresh.apply(df.copy(), 'BTC-USD', 'doubled', edited, output_cols=['doubled'])
+    assert fresh.stats['misses'] == 1, "Edited compute code must not reuse cached columns"
+    assert np.allclose(result['doubled'], df['close'] * 2 + 1)
+
+    fresh.apply(df.copy(), 'BTC-USD', 'doubled', edited, output_cols=['doubled'], version=2)
+    assert fresh.stats['misses'] == 2, "A bumped version must not reuse cached columns"
+    fresh.apply(df.copy(), 'BTC-USD', 'doubled', edited, output_cols=['doubled'], version=2)
+    assert fresh.stats['hits'] == 1
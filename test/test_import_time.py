@@ -0,0 +1,29 @@
+import ast
+import os
+from benchmarks.import_cost import HEAVY_MODULES, IMPORT_BUDGETS_MS, check_budgets, import_cost
+
+
+def test_import_budgets():
+    problems = check_budgets()
+    assert problems == {}, f"Modules over their import budget: {problems}"
+
+
+def test_import_cost_reports_subtree():
+    cost = import_cost('models.formula_7')
+    assert cost['ms'] > 0 and cost['heavy'] == []
+    assert 'pandas' in [name for name, _ in cost['costliest']], "pandas should be a direct import of formula_7"
+    assert 'execution' in IMPORT_BUDGETS_MS and 'models.f7_hmm_signals' in IMPORT_BUDGETS_MS
+
+
+def test_dashboard_defers_heavy_imports():
+    # dashboard.py runs the Streamlit app on import, so check its module-level imports statically
+    with open(os.path.join(os.path.dirname(__file__), '..', 'dashboard.py')) as f:
+        tree = ast.parse(f.read())
+    imported = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            imported.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imported.add(node.module)
+    heavy = {name for name in imported if name.split('.')[0] in HEAVY_MODULES and name != 'streamlit'}
+    assert not heavy and 'models.lstm_model' not in imported, f"dashboard imports {heavy or 'models.lstm_model'}"
@@ -0,0 +1,90 @@
+import pytest
+import pandas as pd
+import numpy as np
+from hmmlearn.hmm import GaussianHMM
+from models import kernels
+from models.kernels import f7_rolling_stats, positions_from_signals, hmm_forward, apply_stop_target
+
+requires_numba = pytest.mark.skipif(not kernels.NUMBA_AVAILABLE, reason="numba not installed")
+
+
+def _sample_prices(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n)))
+    high = close * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = close * (1 - np.abs(rng.normal(0, 0.002, n)))
+    signals = rng.choice([-1, 0, 0, 0, 1], size=n).astype(float)
+    return signals, high, low, close
+
+
+def test_f7_rolling_stats_matches_pandas():
+    _, _, _, close = _sample_prices()
+    returns = pd.Series(close).pct_change()
+    lookback = 20
+    pos = returns.apply(lambda x: x if x > 0 else 0)
+    neg = returns.apply(lambda x: x if x < 0 else 0)
+    expected = np.vstack([
+        pos.rolling(window=lookback).apply(lambda x: (x > 0).sum() / lookback, raw=True),
+        neg.rolling(window=lookback).apply(lambda x: (x < 0).sum() / lookback, raw=True),
+        pos.rolling(window=lookback).apply(lambda x: x[x > 0].mean() if (x > 0).sum() > 0 else 0, raw=True),
+        neg.rolling(window=lookback).apply(lambda x: x[x < 0].mean() if (x < 0).sum() > 0 else 0, raw=True),
+    ])
+    result = f7_rolling_stats(returns.to_numpy(), lookback)
+    assert np.allclose(result, expected, equal_nan=True), "F7 kernel differs from pandas rolling apply"
+    numpy_result = kernels._f7_rolling_stats_numpy(returns.to_numpy(), lookback)
+    assert np.allclose(numpy_result, expected, equal_nan=True), "NumPy F7 kernel differs from pandas"
+
+
+def test_positions_from_signals():
+    signals = np.array([0, 1, 0, 0, -1, 0, np.nan, 1, 0])
+    expected = np.array([0, 1, 1, 1, -1, -1, -1, 1, 1])
+    assert (positions_from_signals(signals) == expected).all(), "Positions do not hold the last signal"
+    assert (kernels._positions_from_signals_numpy(signals) == expected).all(), "NumPy positions differ"
+
+
+def test_hmm_forward_matches_hmmlearn():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 2))
+    model = GaussianHMM(n_components=3, covariance_type="diag", n_iter=20, random_state=42).fit(X)
+    log_frameprob = model._compute_log_likelihood(X)
+    args = (np.log(model.startprob_), np.log(model.transmat_), log_frameprob)
+    _, loglik = hmm_forward(*args)
+    assert np.isclose(loglik, model.score(X)), "Forward log-likelihood differs from hmmlearn"
+    _, numpy_loglik = kernels._hmm_forward_numpy(*args)
+    assert np.isclose(numpy_loglik, model.score(X)), "NumPy forward log-likelihood differs from hmmlearn"
+
+
+def test_apply_stop_target_exits():
+    close = np.array([100.0, 100.0, 100.0, 100.0])
+    high = np.array([100.0, 100.5, 102.5, 100.0])
+    low = np.array([100.0, 99.5, 99.5, 100.0])
+    signals = np.array([1.0, 0.0, 0.0, 0.0])
+    positions, trade_returns = apply_stop_target(signals, high, low, close, stop_pct=0.01, target_pct=0.02)
+    assert list(positions) == [1, 1, 0, 0], "Long should exit at target on bar 2"
+    assert np.isclose(trade_returns[2], 0.02), "Target exit should realize target_pct"
+
+    high[2], low[2] = 102.5, 98.5
+    positions, trade_returns = apply_stop_target(signals, high, low, close, stop_pct=0.01, target_pct=0.02)
+    assert np.isclose(trade_returns[2], -0.01), "Stop should be checked before target"
+
+    signals = np.array([-1.0, 0.0, 1.0, 0.0])
+    high[2], low[2] = 100.0, 100.0
+    positions, trade_returns = apply_stop_target(signals, high, low, close, stop_pct=0.01, target_pct=0.02)
+    assert list(positions) == [-1, -1, 1, 1], "Opposite signal should reverse the position"
+
+
+@requires_numba
+def test_numba_kernels_match_numpy():
+    signals, high, low, close = _sample_prices()
+    returns = pd.Series(close).pct_change().to_numpy()
+    assert np.allclose(kernels._f7_rolling_stats_numba(returns, 20),
+                       kernels._f7_rolling_stats_numpy(returns, 20), equal_nan=True)
+    assert (kernels._positions_from_signals_numba(signals) == kernels._positions_from_signals_numpy(signals)).all()
+    rng = np.random.default_rng(2)
+    args = (np.log(np.full(3, 1 / 3)), np.log(np.full((3, 3), 1 / 3)), rng.normal(size=(200, 3)))
+    nb_alpha, nb_ll = kernels._hmm_forward_numba(*args)
+    np_alpha, np_ll = kernels._hmm_forward_numpy(*args)
+    assert np.allclose(nb_alpha, np_alpha) and np.isclose(nb_ll, np_ll)
+    nb_pos, nb_ret = kernels._stop_target_numba(signals, high, low, close, 0.005, 0.01)
+    np_pos, np_ret = kernels._stop_target_numpy(signals, high, low, close, 0.005, 0.01)
+    assert (nb_pos == np_pos).all() and np.allclose(nb_ret, np_ret)
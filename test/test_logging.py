@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+import pytest
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+# Entry points keep their own log file whatever helpers they import first
+ENTRY_POINT_LOGS = [
+    ('data_pipeline', 'data_pipeline.log'),
+    ('models.formula_7', 'formula_7.log'),
+    ('models.bollinger_bands', 'bollinger_bands.log'),
+    ('models.f7_hmm_signals', 'strategy.log'),
+    ('models.lstm_walkforward', 'lstm_walkforward.log'),
+    ('execution', 'execution.log'),
+]
+
+
+@pytest.mark.parametrize('module, log_file', ENTRY_POINT_LOGS)
+def test_entry_point_logs_to_its_own_file(module, log_file, tmp_path):
+    code = f"import logging, {module}; print(logging.getLogger().handlers[0].baseFilename)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=os.path.abspath(REPO_ROOT)))
+    assert result.returncode == 0, result.stderr
+    assert os.path.basename(result.stdout.strip()) == log_file, f"{module} logs to {result.stdout.strip()}"
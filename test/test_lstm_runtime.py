@@ -0,0 +1,85 @@
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from models.lstm_runtime import FEATURE_COLS, LSTMRuntime, save_runtime, lstm_signal
+
+
+def _sample_df(n=100, offset=0.0):
+    data = {
+        'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min'),
+        'close': [100 + offset + np.sin(i / 10) * 10 for i in range(n)],
+        'open': [100 + offset + np.sin(i / 10) * 9 for i in range(n)],
+        'high': [100 + offset + np.sin(i / 10) * 11 for i in range(n)],
+        'low': [100 + offset + np.sin(i / 10) * 8 for i in range(n)],
+        'base_token_volume': [1000 + i for i in range(n)],
+        'log_returns': [0.001 * np.cos(i) for i in range(n)],
+        'volatility': [0.01 + 0.001 * np.sin(i) for i in range(n)],
+        'f7_value': [0.0001 * np.sin(i / 3) for i in range(n)],
+        'hmm_signal': [1 if i % 7 else -1 for i in range(n)],
+        'bb_signal': [(i % 3) - 1 for i in range(n)],
+    }
+    return pd.DataFrame(data)
+
+
+def random_weights(rng, n_features=len(FEATURE_COLS), units=50, dense_units=25):
+    """Random ``get_weights()`` lists for the LSTM, LSTM, Dense, Dense layers (shared by the LSTM tests)."""
+    return [
+        [rng.normal(0, 0.2, (n_features, 4 * units)), rng.normal(0, 0.2, (units, 4 * units)), rng.normal(0, 0.1, 4 * units)],
+        [rng.normal(0, 0.2, (units, 4 * units)), rng.normal(0, 0.2, (units, 4 * units)), rng.normal(0, 0.1, 4 * units)],
+        [rng.normal(0, 0.2, (units, dense_units)), rng.normal(0, 0.1, dense_units)],
+        [rng.normal(0, 0.2, (dense_units, 1)), rng.normal(0, 0.1, 1)],
+    ]
+
+
+def _reference_forward(weights, window):
+    """Single-window LSTM -> LSTM -> Dense -> Dense, one gate at a time."""
+    sigmoid = lambda x: 1 / (1 + np.exp(-x))
+    seq = window
+    for kernel, recurrent, bias in weights[:2]:
+        units = recurrent.shape[0]
+        h, c, outputs = np.zeros(units), np.zeros(units), []
+        for x in seq:
+            z = x @ kernel + h @ recurrent + bias
+            i, f, g, o = sigmoid(z[:units]), sigmoid(z[units:2 * units]), np.tanh(z[2 * units:3 * units]), sigmoid(z[3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            outputs.append(h)
+        seq = np.array(outputs)
+    h = seq[-1] @ weights[2][0] + weights[2][1]
+    return (h @ weights[3][0] + weights[3][1])[0]
+
+
+def test_runtime_matches_reference(tmp_path):
+    rng = np.random.default_rng(0)
+    dfs = {'BTC-USD': _sample_df(), 'ETH-USD': _sample_df(offset=50.0)}
+    weights, paths = {}, {}
+    for market, df in dfs.items():
+        scaler = MinMaxScaler().fit(df[FEATURE_COLS])
+        weights[market] = (random_weights(rng), scaler)
+        paths[market] = str(tmp_path / f"{market}.npz")
+        save_runtime(paths[market], *weights[market])
+
+    runtime = LSTMRuntime.load(paths)
+    predictions = runtime.predict(dfs)
+    for market, df in dfs.items():
+        layer_weights, scaler = weights[market]
+        window = scaler.transform(df[FEATURE_COLS].iloc[-60:])
+        close_idx = FEATURE_COLS.index('close')
+        expected = (_reference_forward(layer_weights, window) - scaler.min_[close_idx]) / scaler.scale_[close_idx]
+        price, signal = predictions[market]
+        assert np.isclose(price, expected, rtol=1e-4), f"Runtime prediction differs for {market}"
+        assert signal == lstm_signal(expected, df['close'].iloc[-1]), "Invalid LSTM signal"
+
+
+def test_runtime_matches_keras(tmp_path):
+    pytest.importorskip("tensorflow")
+    from models.lstm_model import prepare_lstm_data, train_lstm, export_lstm
+    df = _sample_df()
+    X, y, scaler = prepare_lstm_data(df, lookback=60)
+    model = train_lstm(X, y, epochs=1)
+    path = export_lstm(model, scaler, 'BTC-USD', weights_dir=str(tmp_path))
+    runtime = LSTMRuntime.load(path)
+    expected = model.predict(X, verbose=0)[:, 0]
+    result = runtime.forward(X[None])[0]
+    assert np.allclose(result, expected, atol=1e-5), "NumPy runtime differs from Keras"
@@ -0,0 +1,73 @@
+import os
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from models.lstm_runtime import weights_path
+from models.lstm_trainer import load_manifest, thread_budgets, train_all
+from utils.schema import write_market
+
+
+def _write_candles(db_name, markets, n=100):
+    for k, market in enumerate(markets):
+        close = 100 + k + np.sin(np.arange(n) / 5) * 10
+        df = pd.DataFrame({
+            'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min', tz='UTC').astype(str),
+            'open': close - 1, 'high': close + 2, 'low': close - 2, 'close': close,
+            'base_token_volume': [1000.0] * n
+        })
+        write_market(df, market, db_name)
+
+
+def _fake_train(market, db_name, weights_dir):
+    """Stand-in for train_market: fails for ETH, hangs for SOL, otherwise writes a weights file."""
+    if market == 'ETH-USD':
+        raise ValueError("bad data")
+    if market == 'SOL-USD':
+        time.sleep(60)
+    os.makedirs(weights_dir, exist_ok=True)
+    with open(weights_path(market, weights_dir), 'wb') as f:
+        f.write(os.environ['TF_NUM_INTRAOP_THREADS'].encode())
+    return 1
+
+
+def test_thread_budgets():
+    assert thread_budgets(3, 8) == [3, 3, 2], "Budgets should sum to the core count"
+    assert thread_budgets(4, 2) == [1, 1, 1, 1], "Every worker needs at least one thread"
+    assert sum(thread_budgets(5, 16)) == 16
+
+
+def test_train_all_isolates_failures_and_skips_unchanged(tmp_path):
+    db_name = str(tmp_path / 'crypto.db')
+    weights_dir = str(tmp_path / 'weights')
+    _write_candles(db_name, ['BTC-USD', 'ETH-USD', 'SOL-USD'])
+    progress = []
+    results = train_all(['BTC-USD', 'ETH-USD', 'SOL-USD', 'XRP-USD'], db_name, weights_dir, workers=3,
+                        timeout=5, target=_fake_train, progress=lambda *args: progress.append(args))
+
+    assert results['BTC-USD']['status'] == 'trained', "Healthy market should train"
+    assert results['ETH-USD']['status'] == 'failed' and 'bad data' in results['ETH-USD']['error']
+    assert results['SOL-USD']['status'] == 'timeout', "Hung market should be terminated"
+    assert results['XRP-USD']['status'] == 'failed', "Market without candles should fail without training"
+    assert [p[0] for p in progress] == [1, 2, 3, 4] and all(p[1] == 4 for p in progress), "Progress out of order"
+    assert list(load_manifest(weights_dir)) == ['BTC-USD'], "Only successful markets belong in the manifest"
+    with open(weights_path('BTC-USD', weights_dir)) as f:
+        assert int(f.read()) >= 1, "Worker should receive a thread budget"
+
+    again = train_all(['BTC-USD'], db_name, weights_dir, target=_fake_train)
+    assert again['BTC-USD']['status'] == 'skipped', "Unchanged candles should not retrain"
+
+    _write_candles(db_name, ['BTC-USD'], n=101)
+    changed = train_all(['BTC-USD'], db_name, weights_dir, target=_fake_train)
+    assert changed['BTC-USD']['status'] == 'trained', "New candles should retrain"
+    assert train_all(['BTC-USD'], db_name, weights_dir, force=True, target=_fake_train)['BTC-USD']['status'] == 'trained'
+
+
+def test_train_market_exports_runtime_weights(tmp_path):
+    pytest.importorskip('tensorflow')
+    from models.lstm_trainer import train_market
+    db_name = str(tmp_path / 'crypto.db')
+    weights_dir = str(tmp_path / 'weights')
+    _write_candles(db_name, ['BTC-USD'], n=120)
+    assert train_market('BTC-USD', db_name, weights_dir) == 120
+    assert os.path.exists(weights_path('BTC-USD', weights_dir)), "Trained model should be exported"
@@ -0,0 +1,122 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sqlite3
+from sklearn.preprocessing import MinMaxScaler
+from models.lstm_runtime import FEATURE_COLS, LSTMRuntime, save_runtime
+from models.hmm_regime import filtered_hmm_signal
+from models.lstm_walkforward import hmm_path, load_predictions, segment_path, walk_forward
+from utils.schema import read_market, to_epoch_ms, write_market
+from test.test_lstm_runtime import random_weights
+
+
+def _write_features(db_name, n):
+    i = np.arange(n)
+    close = 100 + np.sin(i / 10) * 10
+    df = pd.DataFrame({
+        'started_at': to_epoch_ms(pd.date_range(start='2025-09-10', periods=n, freq='5min', tz='UTC')),
+        'open': close - 1, 'high': close + 2, 'low': close - 2, 'close': close,
+        'base_token_volume': 1000.0 + i, 'log_returns': 0.001 * np.cos(i), 'volatility': 0.01 + 0.001 * np.sin(i),
+        'f7_value': 0.0001 * np.sin(i / 3), 'hmm_signal': np.where(i % 7, 1, -1), 'bb_signal': i % 3 - 1,
+    })
+    write_market(df, 'BTC-USD', db_name)
+    return df
+
+
+class _FakeFit:
+    """Records the training slices and exports random small models instead of training."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, train_df, path, lookback, epochs):
+        self.calls.append(train_df.copy())
+        rng = np.random.default_rng(len(self.calls))
+        save_runtime(path, random_weights(rng, units=8, dense_units=4), MinMaxScaler().fit(train_df[FEATURE_COLS]),
+                     lookback=lookback)
+
+
+def test_walk_forward_is_out_of_sample_and_incremental(tmp_path):
+    db_name = str(tmp_path / 'crypto.db')
+    weights_dir = str(tmp_path / 'weights')
+    full = _write_features(db_name, 170)
+    _write_features(db_name, 125)
+    fit = _FakeFit()
+    params = dict(db_name=db_name, weights_dir=weights_dir, lookback=10, initial_train=50, retrain_every=30,
+                  train_window=40, fit=fit, batch_size=16)
+    df = walk_forward('BTC-USD', **params)
+
+    assert df['lstm_signal'].iloc[:50].isna().all(), "Candles before the first origin should not be scored"
+    assert df['lstm_signal'].iloc[50:].notna().all(), "Every candle after the first origin should be scored"
+    assert len(fit.calls) == 3, "One model per segment"
+    for call, origin in zip(fit.calls, [50, 80, 110]):
+        assert call['started_at'].max() < df['started_at'].iloc[origin], "Training data leaks past the origin"
+        assert len(call) == 40, "Rolling train window not applied"
+
+    # Batched strided predictions match a one-window-at-a-time prediction with the segment model
+    conn = sqlite3.connect(db_name)
+    stored = load_predictions('BTC-USD', conn)
+    conn.close()
+    for t, seg_start in [(50, 50), (79, 50), (80, 80), (124, 110)]:
+        row = stored[stored['started_at'] == df['started_at'].iloc[t]].iloc[0]
+        path = segment_path('BTC-USD', int(row['origin']), weights_dir)
+        runtime = LSTMRuntime.load(path)
+        with np.load(hmm_path(path)) as data:
+            hmm_params = {key: data[key] for key in data.files}
+        window = df.iloc[seg_start - 40:t + 1].copy()  # the segment's filter starts at its training slice
+        window['hmm_signal'] = filtered_hmm_signal(hmm_params, window)
+        price, signal = runtime.predict(window)['default']
+        assert np.isclose(row['predicted_close'], price, rtol=1e-5), f"Batched prediction differs at row {t}"
+        assert row['lstm_signal'] == signal
+
+    rerun = walk_forward('BTC-USD', **params)
+    assert len(fit.calls) == 3, "Rerun without new candles should not retrain"
+    pd.testing.assert_series_equal(rerun['lstm_signal'], df['lstm_signal'])
+
+    write_market(full.merge(read_market('BTC-USD', db_name)[['started_at', 'lstm_signal']], how='left'),
+                 'BTC-USD', db_name)
+    extended = walk_forward('BTC-USD', **params)
+    assert len(fit.calls) == 4, "The open segment should keep its model; only the new one trains"
+    assert extended['lstm_signal'].iloc[50:].notna().all()
+    pd.testing.assert_series_equal(extended['lstm_signal'].iloc[:125], df['lstm_signal'])
+    conn = sqlite3.connect(db_name)
+    stored = load_predictions('BTC-USD', conn)
+    conn.close()
+    assert len(stored) == 120 and stored['started_at'].is_unique, "Each candle should be stored once"
+
+
+def test_walk_forward_ignores_later_candles(tmp_path):
+    params = dict(lookback=10, initial_train=50, retrain_every=30, train_window=40, batch_size=16)
+    runs = []
+    for name, alter in [('original', False), ('altered', True)]:
+        db_name = str(tmp_path / f"{name}.db")
+        df = _write_features(db_name, 125)
+        if alter:
+            # New candles after the first segment, and an hmm_signal refitted on the whole history
+            rng = np.random.default_rng(1)
+            for col in ['open', 'high', 'low', 'close', 'log_returns', 'volatility', 'f7_value']:
+                df.loc[80:, col] = df.loc[80:, col] * rng.uniform(0.5, 1.5, len(df) - 80)
+            df['hmm_signal'] = -df['hmm_signal']
+            write_market(df, 'BTC-USD', db_name)
+        fit = _FakeFit()
+        runs.append((walk_forward('BTC-USD', db_name, weights_dir=str(tmp_path / name), fit=fit, **params), fit))
+
+    (original, original_fit), (altered, altered_fit) = runs
+    # The first segment trains on the same slice with the same causal HMM labels
+    pd.testing.assert_frame_equal(original_fit.calls[0], altered_fit.calls[0])
+    pd.testing.assert_series_equal(original['lstm_signal'].iloc[:80], altered['lstm_signal'].iloc[:80])
+    conn = sqlite3.connect(str(tmp_path / 'original.db'))
+    expected = load_predictions('BTC-USD', conn).iloc[:30]
+    conn.close()
+    conn = sqlite3.connect(str(tmp_path / 'altered.db'))
+    got = load_predictions('BTC-USD', conn).iloc[:30]
+    conn.close()
+    pd.testing.assert_frame_equal(got, expected, check_exact=True)
+
+
+def test_walk_forward_requires_features(tmp_path):
+    db_name = str(tmp_path / 'crypto.db')
+    _write_features(db_name, 100)[['started_at', 'close']].pipe(write_market, 'ETH-USD', db_name)
+    assert walk_forward('ETH-USD', db_name, weights_dir=str(tmp_path), lookback=10, initial_train=50).empty
+    with pytest.raises(ValueError):
+        walk_forward('BTC-USD', db_name, lookback=60, initial_train=60)
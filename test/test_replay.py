@@ -0,0 +1,92 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sqlite3
+from backtest.replay import ReplayHarness, SimulatedExchange, check_latency, to_candles
+from data_pipeline import candles_to_frame
+from utils.schema import apply_schema
+
+
+def _write_history(db_name, markets, n=120):
+    conn = sqlite3.connect(db_name)
+    for k, market in enumerate(markets):
+        data = {
+            'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min', tz='UTC').astype(str),
+            'close': [100 + k + np.sin(i / 5) * 10 for i in range(n)],
+            'open': [100 + k + np.sin(i / 5) * 9 for i in range(n)],
+            'high': [100 + k + np.sin(i / 5) * 11 for i in range(n)],
+            'low': [100 + k + np.sin(i / 5) * 8 for i in range(n)],
+            'base_token_volume': [1000] * n
+        }
+        pd.DataFrame(data).to_sql(f"{market.replace('-', '_')}_data", conn, index=False, if_exists='replace')
+    conn.close()
+
+
+def test_to_candles_round_trip(tmp_path):
+    db_name = str(tmp_path / 'history.db')
+    _write_history(db_name, ['BTC-USD'])
+    conn = sqlite3.connect(db_name)
+    df = pd.read_sql("SELECT * FROM BTC_USD_data", conn)
+    conn.close()
+    df = apply_schema(df)
+    frame = candles_to_frame(to_candles(df))
+    assert np.allclose(frame['close'], df['close']), "Replayed candles changed prices"
+    assert (frame['started_at'] == df['started_at']).all(), "Replayed candles changed timestamps"
+
+
+def test_replay_harness(tmp_path):
+    db_name = str(tmp_path / 'history.db')
+    markets = ['BTC-USD', 'ETH-USD']
+    _write_history(db_name, markets)
+    exchange = SimulatedExchange(latency_ms=10, slippage_bps=5, seed=1)
+    report = ReplayHarness(markets, db_name, window=50, exchange=exchange).run()
+
+    assert report['ticks'] == 240, "Every candle of every market should be replayed"
+    assert len(report['decisions']) == 240, "Missing decisions"
+    assert list(report['decisions']['started_at']) == sorted(report['decisions']['started_at']), "Ticks out of order"
+    assert report['decisions']['signal'].isin([0, 1, -1]).all(), "Invalid signal values"
+    fills = report['fills']
+    assert len(fills) == report['decisions']['order_id'].notna().sum() > 0, "Orders should be filled"
+    buys, sells = fills[fills['side'] == 'buy'], fills[fills['side'] == 'sell']
+    assert (buys['fill_price'] >= buys['price']).all() and (sells['fill_price'] <= sells['price']).all(), \
+        "Slippage should work against the order"
+    assert set(report['latency'].index) == {'ingest', 'signal', 'order', 'tick'}, "Missing stage latencies"
+    assert report['ticks_per_sec'] > 0
+    assert check_latency(report, {'tick': 1e6}) == {}, "Generous budget should pass"
+    assert 'tick' in check_latency(report, {'tick': 0.0}), "Zero budget should be reported"
+
+
+def test_replay_harness_parallel(tmp_path):
+    db_name = str(tmp_path / 'history.db')
+    markets = ['BTC-USD', 'ETH-USD']
+    _write_history(db_name, markets)
+    sequential = ReplayHarness(markets, db_name, window=50).run(max_candles=60)
+    parallel = ReplayHarness(markets, db_name, window=50).run(max_candles=60, workers=2)
+    assert parallel['ticks'] == sequential['ticks'] == 120, "max_candles should cap each market"
+    pd.testing.assert_frame_equal(parallel['decisions'].drop(columns='order_id'),
+                                  sequential['decisions'].drop(columns='order_id'))
+
+
+def test_replay_harness_rerun_resets_exchange(tmp_path):
+    db_name = str(tmp_path / 'history.db')
+    _write_history(db_name, ['BTC-USD'])
+    harness = ReplayHarness(['BTC-USD'], db_name, window=50)
+    first = harness.run()
+    positions = dict(harness.exchange.positions)
+    second = harness.run()
+    assert len(first['fills']) > 0, "Orders should be filled"
+    pd.testing.assert_frame_equal(first['fills'], second['fills'])
+    assert harness.exchange.positions == positions, "Positions should not carry over between runs"
+
+
+def test_replay_counts_exchange_latency_in_order_stage(tmp_path):
+    db_name = str(tmp_path / 'history.db')
+    _write_history(db_name, ['BTC-USD'])
+    reports = {latency: ReplayHarness(['BTC-USD'], db_name, window=50,
+                                      exchange=SimulatedExchange(latency_ms=latency, latency_jitter_ms=0)).run()
+               for latency in [0, 200]}
+    fills = reports[200]['fills']
+    assert (fills['filled_at'] == fills['candle_time'] + 200).all(), "Fills should land after the modelled latency"
+    slow, fast = reports[200]['latency'], reports[0]['latency']
+    assert slow.loc['order', 'max_ms'] >= 200 > fast.loc['order', 'max_ms'], "Latency should show in the order stage"
+    assert slow.loc['tick', 'max_ms'] >= 200, "Latency should show in the tick"
@@ -0,0 +1,49 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sqlite3
+from backtest.robustness import compute_metrics, block_bootstrap, bootstrap_metrics, load_strategy_returns
+
+
+def test_compute_metrics():
+    returns = np.array([[0.01, -0.02, 0.0, 0.01]])
+    sharpe, max_drawdown, hit_rate = compute_metrics(returns, periods_per_year=1)[0]
+    assert np.isclose(hit_rate, 2 / 3), "Hit rate should ignore flat bars"
+    assert np.isclose(max_drawdown, np.expm1(-0.02)), "Incorrect max drawdown"
+    assert np.isclose(sharpe, returns.mean() / returns.std(ddof=1)), "Incorrect Sharpe"
+
+
+def test_block_bootstrap_keeps_blocks():
+    returns = np.arange(100, dtype=float)
+    paths = block_bootstrap(returns, 50, 10, np.random.default_rng(0))
+    assert paths.shape == (50, 100), "Incorrect resample shape"
+    assert (np.diff(paths[:, :10], axis=1) == 1).all(), "Blocks should be contiguous"
+
+
+def test_bootstrap_metrics_deterministic():
+    rng = np.random.default_rng(0)
+    series = {('BTC-USD', 'candle'): rng.normal(0, 0.01, 300), ('BTC-USD', 'f7'): rng.normal(0, 0.01, 250)}
+    first = bootstrap_metrics(series, n_resamples=300, chunk_size=100, max_workers=2, seed=7)
+    second = bootstrap_metrics(series, n_resamples=300, chunk_size=100, max_workers=1, seed=7)
+    assert len(first) == 6, "Expected three metrics per series"
+    pd.testing.assert_frame_equal(first, second)
+    assert (first['ci_low'] <= first['ci_high']).all(), "Invalid confidence interval"
+
+
+def test_load_strategy_returns(tmp_path):
+    db_name = str(tmp_path / 'test.db')
+    conn = sqlite3.connect(db_name)
+    data = {
+        'started_at': pd.date_range(start='2025-09-10', periods=100, freq='5min').astype(str),
+        'close': [100 + np.sin(i / 10) * 10 for i in range(100)],
+        'open': [100 + np.sin(i / 10) * 9 for i in range(100)],
+        'high': [100 + np.sin(i / 10) * 11 for i in range(100)],
+        'low': [100 + np.sin(i / 10) * 8 for i in range(100)],
+        'base_token_volume': [1000] * 100
+    }
+    pd.DataFrame(data).to_sql('BTC_USD_data', conn, index=False, if_exists='replace')
+    conn.close()
+
+    series = load_strategy_returns('BTC-USD', db_name=db_name)
+    assert set(series) == {'candle', 'bb', 'f7', 'hmm', 'combined'}, "Missing return series"
+    assert all(len(returns) == 100 for returns in series.values()), "Return length changed"
@@ -0,0 +1,57 @@
+import pytest
+import pandas as pd
+import numpy as np
+import os
+import sqlite3
+from models.formula_7 import calculate_formula_7
+from utils.schema import SCHEMA, apply_schema, read_market, write_market, migrate_db, to_datetime
+
+
+def _legacy_df(n=200):
+    data = {
+        'started_at': pd.date_range(start='2025-09-10', periods=n, freq='5min', tz='UTC').astype(str),
+        'close': [100 + np.sin(i / 10) * 10 for i in range(n)],
+        'open': [100 + np.sin(i / 10) * 9 for i in range(n)],
+        'high': [100 + np.sin(i / 10) * 11 for i in range(n)],
+        'low': [100 + np.sin(i / 10) * 8 for i in range(n)],
+        'base_token_volume': [1000.0] * n,
+        'log_returns': [0.001] * n,
+        'volatility': [0.01] * n
+    }
+    return calculate_formula_7(pd.DataFrame(data))
+
+
+def test_apply_schema():
+    df = apply_schema(_legacy_df())
+    assert df['started_at'].dtype == 'int64', "Timestamps should be epoch ms"
+    assert df['started_at'].iloc[0] == 1757462400000, "Incorrect epoch ms"
+    assert to_datetime(df['started_at']).iloc[0] == pd.Timestamp('2025-09-10', tz='UTC'), "Incorrect round trip"
+    assert df['f7_signal'].dtype == 'int8', "Signals should be int8"
+    assert df['volatility'].dtype == 'float32', "Derived values should be float32"
+    assert df['close'].dtype == 'float64', "Prices should stay float64"
+
+
+def test_write_and_read_market():
+    conn = sqlite3.connect(':memory:')
+    write_market(_legacy_df(), 'BTC-USD', conn=conn)
+    df = read_market('BTC-USD', conn=conn)
+    conn.close()
+    assert set(df.columns) <= set(SCHEMA), "Only allowlisted columns should be persisted"
+    assert 'prob_high' not in df.columns, "F7 intermediates should not be persisted"
+    assert all(df[col].dtype == SCHEMA[col] for col in df.columns), "Loaded dtypes should match the schema"
+
+
+def test_migrate_db(tmp_path):
+    db_name = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(db_name)
+    legacy = _legacy_df()
+    legacy.to_sql('BTC_USD_data', conn, index=False, if_exists='replace')
+    conn.close()
+    size_before = os.path.getsize(db_name)
+
+    migrate_db(db_name)
+    df = read_market('BTC-USD', db_name)
+    assert os.path.getsize(db_name) < size_before, "Migration should shrink the database"
+    assert df['started_at'].dtype == 'int64' and len(df) == len(legacy), "Migration lost rows"
+    assert np.allclose(df['close'], legacy['close']), "Migration changed prices"
+    assert (df['f7_signal'] == legacy['f7_signal']).all(), "Migration changed signals"
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.telegram_alerts import AlertDispatcher, TelegramTransport, coalesce
+
+
+class _StubTelegram(BaseHTTPRequestHandler):
+    """Records sendMessage bodies and the client port of every request."""
+    protocol_version = 'HTTP/1.1'  # keep-alive, so a pooled session reuses one connection
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body, self.client_address[1], time.monotonic()))
+        payload = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubTelegram)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_dispatcher_coalesces_and_rate_limits_over_http(stub_server):
+    transport = TelegramTransport('TOKEN', 42, api_url=f"http://127.0.0.1:{stub_server.server_port}")
+    dispatcher = AlertDispatcher(transport, rate_limit=0.3, coalesce_window=0.05)
+    for i in range(20):
+        dispatcher.send(f"BTC-USD signal {i}", key='BTC-USD')
+    dispatcher.send("ETH-USD signal", key='ETH-USD')
+    assert dispatcher.flush(5), "Alerts were not delivered"
+    dispatcher.send("BTC-USD late signal", key='BTC-USD')
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    texts = [body['text'] for _, body, _, _ in stub_server.requests]
+    assert len(texts) == 3, f"Expected one message per key plus the late one, got {texts}"
+    btc = next(text for text in texts if text.startswith('20 alerts (BTC-USD)'))
+    assert all(f"BTC-USD signal {i}" in btc for i in range(20)), "Burst should be coalesced into one message"
+    assert 'ETH-USD signal' in texts
+    btc_times = [at for _, body, _, at in stub_server.requests if 'BTC-USD' in body['text']]
+    assert btc_times[1] - btc_times[0] >= 0.3, "Second BTC message should wait for the per-key rate limit"
+    assert all(path == '/botTOKEN/sendMessage' for path, _, _, _ in stub_server.requests)
+    assert all(body['chat_id'] == 42 for _, body, _, _ in stub_server.requests)
+    assert len({port for _, _, port, _ in stub_server.requests}) == 1, "Session should reuse one pooled connection"
+    stats = dispatcher.stats()
+    assert stats['queued'] == stats['messages'] == 22 and stats['sent'] == 3 and stats['dropped'] == 0
+
+
+def test_full_queue_never_blocks_and_counts_drops():
+    release = threading.Event()
+    delivered = []
+
+    def slow_transport(text):
+        release.wait(5)
+        delivered.append(text)
+
+    for policy, kept in [('oldest', 'alert 9'), ('newest', 'alert 0')]:
+        release.clear()
+        delivered.clear()
+        dispatcher = AlertDispatcher(slow_transport, maxsize=3, rate_limit=0, coalesce_window=0,
+                                     drop_policy=policy)
+        dispatcher.send("blocker", key='x')
+        time.sleep(0.2)  # the sender is now stuck in the transport
+        start = time.perf_counter()
+        for i in range(10):
+            dispatcher.send(f"alert {i}", key='y')
+        assert time.perf_counter() - start < 0.05, "send() must not block while the transport is stalled"
+        stats = dispatcher.stats()
+        assert stats['dropped'] == 7 and stats['queue_size'] == 3, f"{policy}: {stats}"
+        release.set()
+        assert dispatcher.flush(5)
+        dispatcher.close()
+        assert any(kept in text for text in delivered), f"{policy} policy kept the wrong alerts: {delivered}"
+
+
+def test_transport_failures_are_counted():
+    def failing_transport(text):
+        raise ConnectionError("telegram down")
+
+    dispatcher = AlertDispatcher(failing_transport, rate_limit=0, coalesce_window=0)
+    dispatcher.send("a", key='x')
+    dispatcher.send("b", key='y')
+    assert dispatcher.flush(5)
+    dispatcher.close()
+    stats = dispatcher.stats()
+    assert stats['failed'] == 2 and stats['sent'] == 0, "Failures should be counted, not raised"
+
+
+def test_coalesce_truncates_to_telegram_limit():
+    assert coalesce('k', ['one']) == 'one'
+    assert len(coalesce('k', ['x' * 3000, 'y' * 3000])) == 4096
+
+
+def test_live_orders_alert_without_waiting(monkeypatch):
+    import execution
+    from utils import telegram_alerts
+
+    class _Exchange:
+        def create_order(self, market, order_type, side, size, price):
+            return {'id': f"{market}-{side}"}
+
+    release = threading.Event()
+    dispatcher = AlertDispatcher(lambda text: release.wait(5), rate_limit=0, coalesce_window=0)
+    monkeypatch.setattr(telegram_alerts, '_dispatcher', dispatcher)
+    monkeypatch.setattr(execution, 'initialize_exchange', _Exchange)
+    start = time.perf_counter()
+    for _ in range(100):
+        assert execution.place_order('BTC-USD', 'buy', 0.01, 100.0) == {'id': 'BTC-USD-buy'}
+    assert time.perf_counter() - start < 0.1, "A stalled alert transport must not slow down order placement"
+    assert dispatcher.stats()['queued'] == 100
+    release.set()
+    dispatcher.close()
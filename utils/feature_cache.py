@@ -0,0 +1,180 @@
+# utils/feature_cache.py
+"""
+Feature cache shared by the models, backtests and dashboard.
+
+Entries are keyed by (market, feature name, parameters) and validated against
+a fingerprint of the input columns, so a hit means the inputs are
+byte-identical. An in-memory LRU tier with a byte cap sits in front of an
+on-disk tier of uncompressed ``.npz`` files that other processes (the LSTM
+subprocess, the dashboard, optimizer runs) reuse. For causal rolling features
+that declare a ``warmup``, new candles appended to already-cached inputs only
+compute the tail instead of invalidating the entry.
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# A library module: log through whichever entry point configured logging
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = 'feature_cache'
+MAX_MEMORY_BYTES = 256 * 1024 * 1024
+
+
+def row_hashes(df, input_cols):
+    """Per-row uint64 hashes of ``input_cols`` (prefix fingerprints reuse them)."""
+    return pd.util.hash_pandas_object(df[list(input_cols)], index=False).to_numpy()
+
+
+def fingerprint(hashes):
+    """Digest of a run of row hashes."""
+    return hashlib.blake2b(np.ascontiguousarray(hashes).tobytes(), digest_size=16).hexdigest()
+
+
+def code_version(func):
+    """Digest of a function's bytecode, names and constants (nested functions included)."""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return None
+    digest = hashlib.blake2b(digest_size=8)
+    stack = [code]
+    while stack:
+        code = stack.pop()
+        digest.update(code.co_code)
+        digest.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if hasattr(const, 'co_code'):
+                stack.append(const)
+            else:
+                digest.update(repr(const).encode())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Two-tier (memory LRU + disk) cache of computed feature columns."""
+
+    def __init__(self, max_bytes=MAX_MEMORY_BYTES, cache_dir=CACHE_DIR):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'extensions': 0, 'misses': 0, 'evictions': 0}
+
+    @staticmethod
+    def _key(market, name, params, version=0, compute=None):
+        return (market, name, tuple(sorted((params or {}).items())), version, code_version(compute))
+
+    def _path(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[0].replace('-', '_')}_{key[1]}_{digest}.npz")
+
+    def _remember(self, key, entry):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)['nbytes']
+        entry['nbytes'] = sum(col.nbytes for col in entry['columns'].values())
+        self._entries[key] = entry
+        self._bytes += entry['nbytes']
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted['nbytes']
+            self.stats['evictions'] += 1
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name[4:]: data[name] for name in data.files if name.startswith('col_')}
+                entry = {'n': int(data['n']), 'fingerprint': str(data['fingerprint']), 'columns': columns}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable feature cache file {path}: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        self._remember(key, entry)
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, n=np.int64(entry['n']), fingerprint=np.array(entry['fingerprint']),
+                     **{f'col_{name}': values for name, values in entry['columns'].items()})
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write feature cache for {key}: {e}")
+
+    def apply(self, df, market, name, compute, params=None, input_cols=('close',), output_cols=(), warmup=None,
+              version=0):
+        """
+        Assign ``output_cols`` of ``compute(df, **params)`` to ``df``, reusing cached values.
+
+        ``warmup`` is the number of rows before the first new row that
+        ``compute`` needs to reproduce it (e.g. the rolling window); None marks
+        the feature as non-causal, so any change to the inputs recomputes it.
+        Entries are keyed by ``compute``'s bytecode and by ``version``, which
+        callers bump when code that ``compute`` calls changes.
+        """
+        key = self._key(market, name, params, version, compute)
+        params = params or {}
+        hashes = row_hashes(df, input_cols)
+        n = len(df)
+        entry = self._lookup(key)
+        if entry is not None and entry['n'] == n and entry['fingerprint'] == fingerprint(hashes):
+            self.stats['hits'] += 1
+            for col, values in entry['columns'].items():
+                df[col] = values
+            return df
+        if entry is not None and warmup is not None and entry['n'] < n \
+                and entry['fingerprint'] == fingerprint(hashes[:entry['n']]):
+            self.stats['extensions'] += 1
+            start = max(entry['n'] - warmup, 0)
+            tail = compute(df.iloc[start:].copy(), **params)
+            columns = {col: np.concatenate([entry['columns'][col],
+                                            tail[col].to_numpy()[entry['n'] - start:]])
+                       for col in output_cols}
+            logger.info(f"Extended {name} for {market} from {entry['n']} to {n} rows")
+        else:
+            self.stats['misses'] += 1
+            result = compute(df.copy(), **params)
+            missing_cols = [col for col in output_cols if col not in result.columns]
+            if missing_cols:
+                logger.warning(f"Not caching {name} for {market}: missing {missing_cols}")
+                return result
+            columns = {col: result[col].to_numpy() for col in output_cols}
+        for col, values in columns.items():
+            df[col] = values
+        self._store(key, {'n': n, 'fingerprint': fingerprint(hashes), 'columns': columns})
+        return df
+
+    def clear(self, disk=False):
+        """Drop the memory tier (and the on-disk files when ``disk`` is set)."""
+        self._entries.clear()
+        self._bytes = 0
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Process-wide cache used by the backtest functions."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FeatureCache()
+    return _default_cache
@@ -1,9 +1,12 @@
 # utils/logger.py
 import logging
 def setup_logger(name, log_file):
-    logging.basicConfig(
-        filename=log_file,
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s'
-    )
-    return logging.getLogger(name)
\ No newline at end of file
+    # Same first-call-wins setup as logging.basicConfig, but the file is only
+    # opened when the first record is written, so importing a module is free
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.FileHandler(log_file, delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    return logging.getLogger(name)
@@ -0,0 +1,134 @@
+# utils/schema.py
+"""
+Typed schema for candle and signal frames.
+
+``started_at`` is int64 epoch milliseconds (UTC) both in memory and in
+SQLite, so loads never parse datetimes; convert with ``to_datetime`` only for
+display. OHLC prices stay float64 because 5-minute returns (~1e-4) would lose
+about 0.1% of their precision in float32. Derived floats and volume are
+float32 and signals are int8. Only the ``SCHEMA`` columns are persisted;
+intermediates such as the F7 components or ``ma20``/``std20`` are recomputed
+on demand. Frames are downcast at the load/save boundaries (``read_market``,
+``write_market``, ``data_pipeline.candles_to_frame``).
+
+Migrate existing tables with: python -m utils.schema crypto_data.db
+"""
+import logging
+import sqlite3
+import sys
+import pandas as pd
+from utils.logger import setup_logger
+
+# A library module: log through whichever entry point configured logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = {
+    'started_at': 'int64',
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'base_token_volume': 'float32',
+    'log_returns': 'float32',
+    'volatility': 'float32',
+    'upper_band': 'float32',
+    'lower_band': 'float32',
+    'bb_signal': 'int8',
+    'f7_value': 'float32',
+    'f7_signal': 'int8',
+    'regime': 'int8',
+    'hmm_signal': 'int8',
+    'lstm_signal': 'Int8',  # nullable: only candles the LSTM has scored carry a signal
+}
+SQL_TYPES = {'int64': 'INTEGER', 'int8': 'INTEGER', 'Int8': 'INTEGER', 'float64': 'REAL', 'float32': 'REAL'}
+
+
+def table_name(market):
+    return f"{market.replace('-', '_')}_data"
+
+
+def to_epoch_ms(values):
+    """Epoch milliseconds (int64) from ISO strings, datetimes or integers already in ms."""
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype('int64')
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, utc=True, format='ISO8601')
+    elif values.dt.tz is None:
+        values = values.dt.tz_localize('UTC')
+    return values.dt.tz_convert('UTC').astype('datetime64[ms, UTC]').astype('int64')
+
+
+def to_datetime(values):
+    """UTC datetimes from epoch milliseconds, for display and plotting."""
+    return pd.to_datetime(values, unit='ms', utc=True)
+
+
+def apply_schema(df):
+    """Downcast the schema columns present in ``df`` in place; other columns are left alone."""
+    if 'started_at' in df.columns and df['started_at'].dtype != 'int64':
+        df['started_at'] = to_epoch_ms(df['started_at']).to_numpy()
+    for col, dtype in SCHEMA.items():
+        if col in df.columns and col != 'started_at' and df[col].dtype != dtype:
+            values = df[col]
+            if dtype == 'int8':
+                values = values.fillna(0)
+            df[col] = values.astype(dtype)
+    return df
+
+
+def persisted(df):
+    """The allowlisted columns of ``df`` in schema order and dtypes."""
+    return apply_schema(df[[col for col in SCHEMA if col in df.columns]].copy())
+
+
+def read_market(market='BTC-USD', db_name='crypto_data.db', conn=None, columns=None):
+    """Load a market table with schema dtypes (legacy ISO timestamps are converted once)."""
+    close_conn = conn is None
+    if close_conn:
+        conn = sqlite3.connect(db_name)
+    try:
+        select = ', '.join(columns) if columns else '*'
+        df = pd.read_sql(f"SELECT {select} FROM {table_name(market)}", conn)
+    finally:
+        if close_conn:
+            conn.close()
+    return apply_schema(df)
+
+
+def write_market(df, market='BTC-USD', db_name='crypto_data.db', conn=None):
+    """Replace a market table with the allowlisted columns of ``df``."""
+    df = persisted(df)
+    close_conn = conn is None
+    if close_conn:
+        conn = sqlite3.connect(db_name)
+    try:
+        df.to_sql(table_name(market), conn, if_exists='replace', index=False,
+                  dtype={col: SQL_TYPES[SCHEMA[col]] for col in df.columns})
+    finally:
+        if close_conn:
+            conn.close()
+    return df
+
+
+def migrate_db(db_name='crypto_data.db'):
+    """Rewrite every market table with the compact schema and reclaim the freed pages."""
+    conn = sqlite3.connect(db_name)
+    try:
+        tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE '%\\_data' ESCAPE '\\'",
+                             conn)['name']
+        for table in tables:
+            market = table[:-len('_data')].replace('_', '-')
+            df = read_market(market, conn=conn)
+            dropped = [col for col in df.columns if col not in SCHEMA]
+            write_market(df, market, conn=conn)
+            logger.info(f"Migrated {table}: {len(df)} rows, dropped {dropped}")
+            print(f"Migrated {table}: {len(df)} rows, dropped {dropped}")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    setup_logger('schema', 'schema.log')
+    migrate_db(sys.argv[1] if len(sys.argv) > 1 else 'crypto_data.db')
@@ -1,4 +1,195 @@
 # utils/telegram_alerts.py
-def send_alert(message):
-    # Placeholder for Telegram API integration
-    print(f"Telegram alert: {message}")
\ No newline at end of file
+"""
+Non-blocking alerts for the trading loop.
+
+``send_alert`` only puts the message on a bounded queue and returns; a single
+background thread delivers it through a transport. Messages sharing a key
+(e.g. a market) that arrive within ``coalesce_window`` seconds are merged into
+one message, and each key is sent at most once per ``rate_limit`` seconds,
+with everything that arrives in between merged into the next message. When
+the queue is full the oldest (or, with ``drop_policy='newest'``, the
+incoming) message is dropped and counted, so a slow or unreachable Telegram
+never adds latency to signal generation or order placement.
+
+Transports are callables taking the message text. ``TelegramTransport`` posts
+to the Bot API over one pooled HTTP connection; without
+``TELEGRAM_BOT_TOKEN``/``TELEGRAM_CHAT_ID`` in the environment alerts are
+printed, as before.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+# A library module: log through whichever entry point configured logging
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = 'https://api.telegram.org'
+MAX_MESSAGE_CHARS = 4096  # Telegram's sendMessage limit
+
+
+class TelegramTransport:
+    """Bot API ``sendMessage`` over a pooled ``requests.Session``."""
+
+    def __init__(self, token, chat_id, api_url=TELEGRAM_API_URL, timeout=5.0):
+        self.url = f"{api_url}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+        self.session = None
+
+    def __call__(self, text):
+        if self.session is None:
+            import requests
+            self.session = requests.Session()
+        response = self.session.post(self.url, json={'chat_id': self.chat_id, 'text': text}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+def print_transport(text):
+    """Fallback transport when Telegram is not configured."""
+    print(f"Telegram alert: {text}")
+
+
+def coalesce(key, messages):
+    """One message for a batch of alerts sharing ``key``."""
+    text = messages[0] if len(messages) == 1 else f"{len(messages)} alerts ({key}):\n" + "\n".join(messages)
+    return text if len(text) <= MAX_MESSAGE_CHARS else text[:MAX_MESSAGE_CHARS - 3] + '...'
+
+
+class AlertDispatcher:
+    """Bounded queue plus one sender thread that coalesces and rate-limits alerts per key."""
+
+    def __init__(self, transport=print_transport, maxsize=1000, rate_limit=1.0, coalesce_window=0.5,
+                 drop_policy='oldest'):
+        if drop_policy not in ('oldest', 'newest'):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.transport = transport
+        self.rate_limit = rate_limit
+        self.coalesce_window = coalesce_window
+        self.drop_policy = drop_policy
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = {}  # key -> (first queued time, [messages]); only touched by the sender thread
+        self._next_send = {}  # key -> earliest time the next message may go out
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._outstanding = 0  # queued but not yet delivered, failed or dropped
+        self.counters = {'queued': 0, 'dropped': 0, 'sent': 0, 'messages': 0, 'failed': 0}
+
+    def _count(self, name, n=1, outstanding=0):
+        with self._lock:
+            self.counters[name] += n
+            self._outstanding += outstanding
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, queue_size=self._queue.qsize())
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+                self._thread.start()
+
+    def send(self, message, key='default'):
+        """Queue an alert without blocking; returns False if it was dropped."""
+        if self._thread is None:
+            self.start()
+        item = (key, str(message), time.monotonic())
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.drop_policy == 'newest':
+                self._count('dropped')
+                return False
+            try:
+                self._queue.get_nowait()
+                self._count('dropped', outstanding=-1)
+                self._queue.put_nowait(item)
+            except (queue.Empty, queue.Full):
+                self._count('dropped')
+                return False
+        self._count('queued', outstanding=1)
+        return True
+
+    def _flush_at(self, key):
+        first, _ = self._pending[key]
+        return max(first + self.coalesce_window, self._next_send.get(key, 0.0))
+
+    def _deliver(self, key):
+        _, messages = self._pending.pop(key)
+        try:
+            self.transport(coalesce(key, messages))
+            self._count('sent')
+            self._count('messages', len(messages), outstanding=-len(messages))
+        except Exception as e:
+            self._count('failed', len(messages), outstanding=-len(messages))
+            logger.error(f"Failed to deliver {len(messages)} alert(s) for {key}: {e}")
+        # The interval starts once the transport returns, so slow requests cannot exceed the rate
+        self._next_send[key] = time.monotonic() + self.rate_limit
+
+    def _run(self):
+        while True:
+            stopping = self._stop.is_set()
+            now = time.monotonic()
+            wait = min((self._flush_at(key) - now for key in self._pending), default=0.1)
+            items = []
+            try:
+                items.append(self._queue.get(timeout=max(0.0, min(wait, 0.1))))
+                # Drain the rest of a burst before deciding what to flush
+                while len(items) < 1000:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            for key, message, queued_at in items:
+                self._pending.setdefault(key, (queued_at, []))[1].append(message)
+            now = time.monotonic()
+            for key in [key for key in self._pending if stopping or self._flush_at(key) <= now]:
+                self._deliver(key)
+            if stopping and self._queue.empty() and not self._pending:
+                return
+
+    def flush(self, timeout=10.0):
+        """Wait until every queued alert has been delivered (or failed); returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._outstanding == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout=5.0):
+        """Send whatever is pending (ignoring rate limits) and stop the sender thread."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout)
+            self._thread = None
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+
+_dispatcher = None
+
+
+def get_dispatcher():
+    """Process-wide dispatcher, configured from TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID."""
+    global _dispatcher
+    if _dispatcher is None:
+        token, chat_id = os.environ.get('TELEGRAM_BOT_TOKEN'), os.environ.get('TELEGRAM_CHAT_ID')
+        transport = TelegramTransport(token, chat_id) if token and chat_id else print_transport
+        _dispatcher = AlertDispatcher(transport)
+        atexit.register(_dispatcher.close)
+    return _dispatcher
+
+
+def send_alert(message, key='default'):
+    """Queue a Telegram alert; never blocks the caller."""
+    return get_dispatcher().send(message, key)